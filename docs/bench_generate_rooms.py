@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+
+"""Benchmark generate_rooms.py on synthetic catalogs.
+
+    python bench_generate_rooms.py                          # 14, 1000 and 50000 rooms
+    python bench_generate_rooms.py --sizes 1000 --json results.json
+    python bench_generate_rooms.py --save-baseline baseline.json
+    python bench_generate_rooms.py --baseline baseline.json --threshold 0.1 --repeat 5
+    python bench_generate_rooms.py --sizes 1000 --profile cprofile
+    python bench_generate_rooms.py --sizes 5000 --jobs 1 2 4 8
+
+Each catalog size runs in a fresh process, so its peak RSS is its own, and
+writes into a fresh temporary directory. The phases are:
+
+    load    parse and validate the catalog JSON (load_catalog)
+    render  render every page to a string (the generate_room_html path)
+    write   stream every page to disk with its precompressed siblings
+
+plus, with --jobs, a cold build_all for each pool size. With --repeat N
+every phase runs N times and its median is kept, so one fsync stall or one
+unusually quiet moment on the machine doesn't decide the result.
+
+Pages are rendered with fingerprinted, minified assets as a normal build
+does, unless --no-assets is given. The byte totals are the pages as
+written: raw and, for optimized pages, gzip (and brotli when available).
+
+Results are printed as a table and, with --json, written as JSON. With
+--baseline, a run whose times or peak RSS grow by more than --threshold,
+or whose page bytes grow by more than --bytes-threshold, against the stored
+results exits with status 1. Baselines only compare on the same machine, and
+times are only trustworthy with --repeat on both sides.
+
+--profile adds a pass that renders every page with generate_room_html
+under cProfile (written as a .prof file for pstats or snakeviz) or
+pyinstrument (an HTML report, if it is installed). It runs after the timed
+phases, so it doesn't skew them, but it does raise peak RSS.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import generate_rooms
+from build_output import ENCODINGS, OutputWriter
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+try:
+    import pyinstrument
+except ImportError:  # optional dependency
+    pyinstrument = None
+
+RESULTS_VERSION = 1
+DEFAULT_SIZES = (14, 1000, 50000)
+PROFILE_DIR = os.path.join(generate_rooms.BASE_DIR, '.build-cache', 'bench')
+
+# Time differences below MIN_TIME_DELTA plus MIN_TIME_DELTA_PER_ROOM for
+# every room are noise, whatever the ratio: small catalogs finish in a few
+# milliseconds, where one fsync stall is already past any threshold
+MIN_TIME_DELTA = 0.010
+MIN_TIME_DELTA_PER_ROOM = 0.000005
+
+
+def synthetic_catalog(count):
+    base_rooms = generate_rooms.load_catalog()['rooms']
+    room_list = []
+    for i in range(count):
+        base = base_rooms[i % len(base_rooms)]
+        room_list.append(dict(base, id=f'room-{1000 + i}', price=base['price'] + i % 50))
+    return room_list
+
+
+def page_options(no_assets):
+    """The render options of a normal build, without writing any assets."""
+    # The stylesheet is generated in memory, so this works on a fresh clone
+    with open(os.devnull, 'w') as devnull:
+        options, _ = generate_rooms.build_asset_options(
+            OutputWriter(dry_run=True), no_assets=no_assets, log=devnull)
+    return options
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes, or None."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def profile_render(room_list, options, kind):
+    """Render every page under a profiler; returns the report path."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    if kind == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        for room in room_list:
+            profiler.runcall(generate_rooms.generate_room_html, room, options)
+        path = os.path.join(PROFILE_DIR, f'render-{len(room_list)}.prof')
+        profiler.dump_stats(path)
+    else:
+        profiler = pyinstrument.Profiler()
+        with profiler:
+            for room in room_list:
+                generate_rooms.generate_room_html(room, options)
+        path = os.path.join(PROFILE_DIR, f'render-{len(room_list)}.html')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(profiler.output_html())
+    return path
+
+
+def time_build(room_list, options, jobs):
+    with tempfile.TemporaryDirectory() as tmp:
+        out_dir = os.path.join(tmp, 'rooms')
+        manifest_path = os.path.join(tmp, 'manifest.json')
+        start = time.perf_counter()
+        counts, errors, _ = generate_rooms.build_all(
+            room_list, out_dir=out_dir, manifest_path=manifest_path,
+            options=options, jobs=jobs, verbose=False)
+        elapsed = time.perf_counter() - start
+    if errors:
+        raise SystemExit(f'{len(errors)} rooms failed, first: {errors[0]}')
+    return elapsed
+
+
+def render_and_write(room_list, options, out_dir):
+    """Time one render and write pass; returns (render, write, raw sizes, compressed)."""
+    # Render and write alternate page by page, so the pages are never all
+    # in memory at once; each phase's clock only runs during its own work
+    writer = OutputWriter()
+    render_time = write_time = 0.0
+    raw_sizes = []
+    compressed = dict.fromkeys(ENCODINGS if options['optimize'] else (), 0)
+    for room in room_list:
+        start = time.perf_counter()
+        html = generate_rooms.generate_room_html(room, options)
+        render_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        stream = writer.stream(os.path.join(out_dir, f"{room['id']}.html"), [html],
+                               compress=options['optimize'])
+        write_time += time.perf_counter() - start
+        raw_sizes.append(stream.size)
+        for suffix, size in stream.compressed_sizes.items():
+            compressed[suffix] += size
+    return render_time, write_time, raw_sizes, compressed
+
+
+def run_scenario(rooms, no_assets=False, profile=None, jobs=(), repeat=1):
+    """Benchmark one catalog size; returns its results dict.
+
+    Each phase runs repeat times and keeps its median.
+    """
+    options = page_options(no_assets)
+    room_list = synthetic_catalog(rooms)
+    times = {}
+    result = {'rooms': rooms, 'optimize': options['optimize'], 'repeat': repeat,
+              'seconds': times}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, 'catalog.json')
+        with open(catalog_path, 'w', encoding='utf-8') as f:
+            json.dump({'rooms': room_list}, f, ensure_ascii=False)
+        del room_list
+
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            room_list = generate_rooms.load_catalog(catalog_path)['rooms']
+            samples.append(time.perf_counter() - start)
+        times['load'] = statistics.median(samples)
+
+        # Every pass writes new files, as a cold build would
+        out_dir = os.path.join(tmp, 'rooms')
+        render_samples, write_samples = [], []
+        for _ in range(repeat):
+            render_time, write_time, raw_sizes, compressed = render_and_write(
+                room_list, options, out_dir)
+            render_samples.append(render_time)
+            write_samples.append(write_time)
+            shutil.rmtree(out_dir)
+        times['render'] = statistics.median(render_samples)
+        times['write'] = statistics.median(write_samples)
+
+    for pool_size in jobs:
+        times[f'build_j{pool_size}'] = statistics.median(
+            time_build(room_list, options, pool_size) for _ in range(repeat))
+
+    total = sum(raw_sizes)
+    result['bytes'] = {
+        'total': {'raw': total, **{suffix.lstrip('.'): size for suffix, size in compressed.items()}},
+        'per_page': {
+            'raw': total / rooms,
+            'max_raw': max(raw_sizes),
+            **{suffix.lstrip('.'): size / rooms for suffix, size in compressed.items()},
+        },
+    }
+    result['peak_rss'] = peak_rss()
+    if profile:
+        # A separate pass, so the profiler's overhead stays out of the timings
+        result['profile'] = profile_render(room_list, options, profile)
+    return result
+
+
+def run_isolated(rooms, **kwargs):
+    # A spawned child starts from an empty heap, so ru_maxrss is this size's alone
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(run_scenario, rooms, **kwargs).result()
+
+
+def metrics(result):
+    """Flatten a scenario into {metric name: (value, kind)} for comparison."""
+    flat = {f'seconds.{phase}': (value, 'time') for phase, value in result['seconds'].items()}
+    if result.get('peak_rss') is not None:
+        flat['peak_rss'] = (result['peak_rss'], 'rss')
+    for encoding, value in result['bytes']['per_page'].items():
+        flat[f'bytes.per_page.{encoding}'] = (value, 'bytes')
+    return flat
+
+
+def compare(results, baseline, threshold, bytes_threshold):
+    """Return [(size, metric, old, new)] for every metric past its threshold.
+
+    A time must also grow by more than the noise floor of its catalog size.
+    """
+    regressions = []
+    for size, result in results['scenarios'].items():
+        old_result = baseline.get('scenarios', {}).get(size)
+        if old_result is None or old_result.get('optimize') != result['optimize']:
+            continue
+        old_metrics = metrics(old_result)
+        for name, (new, kind) in metrics(result).items():
+            if name not in old_metrics:
+                continue
+            old = old_metrics[name][0]
+            limit = bytes_threshold if kind == 'bytes' else threshold
+            if new <= old * (1 + limit):
+                continue
+            noise = MIN_TIME_DELTA + MIN_TIME_DELTA_PER_ROOM * result['rooms']
+            if kind == 'time' and new - old < noise:
+                continue
+            regressions.append((size, name, old, new))
+    return regressions
+
+
+def _mb(size):
+    return f'{size / (1 << 20):.1f} MB' if size is not None else 'n/a'
+
+
+def print_result(result):
+    times = result['seconds']
+    per_page = result['bytes']['per_page']
+    total = result['bytes']['total']
+    phases = '  '.join(f'{phase} {value:.3f}s' for phase, value in times.items())
+    if result.get('repeat', 1) > 1:
+        phases += f" (median of {result['repeat']})"
+    print(f"{result['rooms']:>6} rooms  {phases}  "
+          f"({result['rooms'] / times['render']:.0f} pages/s rendered)")
+    sizes = '  '.join(f'{encoding} {value / 1024:.1f} KB' for encoding, value in per_page.items())
+    print(f"{'':>14}per page: {sizes}  total raw {_mb(total['raw'])}  "
+          f"peak RSS {_mb(result['peak_rss'])}")
+    if 'profile' in result:
+        print(f"{'':>14}profile: {result['profile']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='catalog sizes to benchmark (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, nargs='+', default=[],
+                        help='also time a cold build_all for each of these pool sizes')
+    parser.add_argument('--repeat', type=int, default=1, metavar='N',
+                        help='run every phase N times and keep the median (default: %(default)s)')
+    parser.add_argument('--no-assets', action='store_true',
+                        help='benchmark plain pages instead of minified, precompressed ones')
+    parser.add_argument('--profile', choices=('cprofile', 'pyinstrument'),
+                        help=f'profile the render phase into {os.path.relpath(PROFILE_DIR)}/')
+    parser.add_argument('--json', metavar='PATH', help='write the results as JSON')
+    parser.add_argument('--baseline', metavar='PATH',
+                        help='fail if the results regress against this stored run')
+    parser.add_argument('--save-baseline', metavar='PATH',
+                        help='store these results as the baseline for later runs')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed relative growth of times and peak RSS (default: %(default)s)')
+    parser.add_argument('--bytes-threshold', type=float, default=0.01,
+                        help='allowed relative growth of page bytes (default: %(default)s)')
+    args = parser.parse_args(argv)
+    if args.profile == 'pyinstrument' and pyinstrument is None:
+        parser.error('--profile pyinstrument needs the pyinstrument package')
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    results = {
+        'version': RESULTS_VERSION,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'scenarios': {},
+    }
+    print(f"Python {results['python']}, {results['cpus']} CPUs")
+    for rooms in args.sizes:
+        result = run_isolated(rooms, no_assets=args.no_assets, profile=args.profile,
+                              jobs=tuple(args.jobs), repeat=args.repeat)
+        results['scenarios'][str(rooms)] = result
+        print_result(result)
+
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+                f.write('\n')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.bytes_threshold)
+        for size, name, old, new in regressions:
+            print(f'REGRESSION {size} rooms {name}: {old:.6g} -> {new:.6g} '
+                  f'({(new / old - 1) * 100:+.1f}%)', file=sys.stderr)
+        if regressions:
+            return 1
+        print(f'No regressions against {args.baseline}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
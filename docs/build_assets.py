@@ -0,0 +1,326 @@
+"""Build-time asset stage for the site generator.
+
+Minifies the shared CSS/JS, writes them under content-hashed names next to
+the originals (css/site.<hash>.css, ...) and adds precompressed .gz/.br
+siblings for the static host. Generated pages reference the hashed names,
+so the files can be served with immutable cache headers.
+
+Brotli output needs the optional ``brotli`` package; without it only .gz
+siblings are written.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Shared assets linked from the generated pages, relative to the site root
+ASSETS = (
+    'css/site.css',
+    'js/navigation.js',
+    'js/booking.js',
+    'js/payment.js',
+    'js/room-search.js',
+)
+
+FINGERPRINT_LENGTH = 10
+
+# Cache-Control for fingerprinted files, in the _headers format understood by
+# Netlify / Cloudflare Pages style hosts
+HEADERS_FILE = '_headers'
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+# CSS
+
+_CSS_TOKEN_RE = re.compile(r'''/\*.*?\*/|"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|\s+|[^\s"'/]+|/''', re.S)
+
+
+def minify_css(text):
+    out = []
+    for token in _CSS_TOKEN_RE.findall(text):
+        if token.startswith('/*'):
+            continue
+        if token.isspace():
+            out.append(' ')
+        else:
+            out.append(token)
+    css = ''.join(out)
+    # Strings were kept intact above; the punctuation below never appears
+    # inside the ones this site uses in a way that would change meaning
+    parts = re.split(r'''("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')''', css)
+    for i in range(0, len(parts), 2):
+        part = parts[i]
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        part = re.sub(r':\s+', ':', part)
+        part = part.replace(';}', '}')
+        parts[i] = part
+    return ''.join(parts).strip()
+
+
+# JS
+
+# Characters after which a "/" starts a regular expression literal
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+_REGEX_KEYWORDS = ('return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'void')
+_IDENTIFIER_CHARS = set('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_$')
+
+
+def _ends_with_keyword(code):
+    # A whole keyword, not the tail of an identifier such as domain or undo
+    for keyword in _REGEX_KEYWORDS:
+        if code.endswith(keyword):
+            before = code[-len(keyword) - 1:-len(keyword)]
+            if not before or before not in _IDENTIFIER_CHARS:
+                return True
+    return False
+
+
+def minify_js(text):
+    """Strip comments and indentation from JavaScript.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly
+    as before; only whitespace-only changes and comment removal are made.
+    String, template and regex literals are copied through untouched.
+    """
+    out = []
+    i = 0
+    n = len(text)
+    # Stack of open template literals; each entry is the brace depth of the
+    # ${ ... } expression we are currently inside (None = in literal text)
+    templates = []
+    brace_depth = 0
+
+    def last_significant():
+        for chunk in reversed(out):
+            stripped = chunk.rstrip()
+            if stripped:
+                return stripped
+        return ''
+
+    while i < n:
+        c = text[i]
+
+        if templates and templates[-1] is None:
+            # Inside template literal text
+            j = i
+            while j < n:
+                if text[j] == '\\':
+                    j += 2
+                    continue
+                if text[j] == '`':
+                    out.append(text[i:j + 1])
+                    templates.pop()
+                    i = j + 1
+                    break
+                if text.startswith('${', j):
+                    out.append(text[i:j + 2])
+                    templates[-1] = brace_depth
+                    brace_depth += 1
+                    i = j + 2
+                    break
+                j += 1
+            else:
+                out.append(text[i:])
+                i = n
+            continue
+
+        if c in '"\'':
+            j = i + 1
+            while j < n and text[j] != c:
+                j += 2 if text[j] == '\\' else 1
+            out.append(text[i:j + 1])
+            i = j + 1
+        elif c == '`':
+            out.append(c)
+            templates.append(None)
+            i += 1
+        elif text.startswith('//', i):
+            j = text.find('\n', i)
+            i = n if j == -1 else j
+        elif text.startswith('/*', i):
+            j = text.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+            out.append(' ')
+        elif c == '/':
+            prev = last_significant()
+            is_regex = not prev or prev[-1] in _REGEX_PRECEDERS or _ends_with_keyword(prev)
+            if is_regex:
+                j = i + 1
+                in_class = False
+                while j < n and (in_class or text[j] != '/'):
+                    if text[j] == '\\':
+                        j += 1
+                    elif text[j] == '[':
+                        in_class = True
+                    elif text[j] == ']':
+                        in_class = False
+                    j += 1
+                j += 1
+                while j < n and text[j].isalpha():
+                    j += 1
+                out.append(text[i:j])
+                i = j
+            else:
+                out.append(c)
+                i += 1
+        elif c == '{':
+            brace_depth += 1
+            out.append(c)
+            i += 1
+        elif c == '}':
+            brace_depth -= 1
+            if templates and templates[-1] == brace_depth:
+                templates[-1] = None
+            out.append(c)
+            i += 1
+        else:
+            j = i + 1
+            while j < n and text[j] not in '"\'`/{}':
+                j += 1
+            out.append(text[i:j])
+            i = j
+
+    lines = (line.strip() for line in ''.join(out).splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+# HTML
+
+_HTML_RAW_RE = re.compile(r'(<(script|style|pre|textarea)\b[^>]*>)(.*?)(</\2\s*>)', re.S | re.I)
+_HTML_COMMENT_RE = re.compile(r'<!--(?!\[if).*?-->', re.S)
+
+
+def minify_html(text):
+    """Drop comments and collapse whitespace between and around tags.
+
+    Runs of whitespace become a single character (a newline if the run had
+    one), which keeps inline text spacing intact. Inline <script>/<style>
+    bodies are minified with the JS/CSS minifiers; <pre>/<textarea> are left
+    alone.
+    """
+    return minify_html_fragment(text).strip()
+
+
+def minify_html_fragment(text):
+    """minify_html without trimming the ends, for pieces of a larger page.
+
+    A run of spaces at either end still collapses to one, so text that is
+    joined to a slot value keeps its word break.
+    """
+    out = []
+    pos = 0
+    for match in _HTML_RAW_RE.finditer(text):
+        out.append(_collapse_html(text[pos:match.start()]))
+        open_tag, tag, body, close_tag = match.groups()
+        tag = tag.lower()
+        if tag == 'script' and 'src=' not in open_tag:
+            body = minify_js(body)
+        elif tag == 'style':
+            body = minify_css(body)
+        out.append(_collapse_html(open_tag) + body + close_tag)
+        pos = match.end()
+    out.append(_collapse_html(text[pos:]))
+    return ''.join(out)
+
+
+def _collapse_html(text):
+    text = _HTML_COMMENT_RE.sub('', text)
+    return re.sub(r'\s+', lambda m: '\n' if '\n' in m.group() else ' ', text)
+
+
+# Fingerprinting and compression
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js, '.html': minify_html}
+
+
+def fingerprint_name(path, data):
+    root, ext = os.path.splitext(path)
+    digest = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+    return f'{root}.{digest}{ext}'
+
+
+def compress(data):
+    """Return {'.gz': bytes, '.br': bytes} for the encodings available."""
+    encoded = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded['.br'] = brotli.compress(data, quality=11)
+    return encoded
+
+
+def write_compressed(path, data, write):
+    """Write .gz/.br siblings of path through write(path, bytes)."""
+    for suffix, encoded in compress(data).items():
+        write(path + suffix, encoded)
+
+
+def _is_fingerprint_of(name, root, ext):
+    middle = name[len(root) + 1:len(name) - len(ext)]
+    return (name.startswith(root + '.') and name.endswith(ext)
+            and len(middle) == FINGERPRINT_LENGTH
+            and all(ch in '0123456789abcdef' for ch in middle))
+
+
+def build_assets(site_dir, write, assets=ASSETS, prune=True, contents=None):
+    """Minify, fingerprint and precompress the shared assets.
+
+    write(path, bytes) is the generator's output writer. contents maps
+    assets generated earlier in the build (css/site.css) to their bytes,
+    which are used instead of the file on disk. Older fingerprinted copies
+    are deleted unless prune is false (dry runs). Returns (urls, minified,
+    sizes): urls maps each asset path to its fingerprinted path, minified
+    to its minified text and sizes to (original, minified, compressed) byte
+    counts, where compressed is the smallest precompressed encoding.
+    """
+    contents = contents or {}
+    urls = {}
+    minified_text = {}
+    sizes = {}
+    for asset in assets:
+        original = contents.get(asset)
+        if original is None:
+            with open(os.path.join(site_dir, asset), 'rb') as f:
+                original = f.read()
+        ext = os.path.splitext(asset)[1]
+        minified_text[asset] = MINIFIERS[ext](original.decode('utf-8'))
+        minified = minified_text[asset].encode('utf-8')
+
+        hashed = fingerprint_name(asset, minified)
+        hashed_path = os.path.join(site_dir, hashed)
+        write(hashed_path, minified)
+        write_compressed(hashed_path, minified, write)
+        if prune:
+            _prune_fingerprints(site_dir, asset, keep=os.path.basename(hashed))
+
+        urls[asset] = hashed
+        sizes[asset] = (len(original), len(minified),
+                        min(len(v) for v in compress(minified).values()))
+
+    write(os.path.join(site_dir, HEADERS_FILE), headers_file(urls).encode('utf-8'))
+    return urls, minified_text, sizes
+
+
+def _prune_fingerprints(site_dir, asset, keep):
+    # Remove older fingerprinted copies (and their .gz/.br) of this asset
+    directory, name = os.path.split(os.path.join(site_dir, asset))
+    root, ext = os.path.splitext(name)
+    for entry in os.listdir(directory):
+        base = entry
+        for suffix in ('.gz', '.br'):
+            if base.endswith(suffix):
+                base = base[:-len(suffix)]
+        if base != keep and _is_fingerprint_of(base, root, ext):
+            os.remove(os.path.join(directory, entry))
+
+
+def headers_file(urls):
+    lines = []
+    for hashed in sorted(urls.values()):
+        lines.append(f'/{hashed}')
+        lines.append(f'  Cache-Control: {IMMUTABLE}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,178 @@
+"""Per-room availability and nightly rate calendars for the booking form.
+
+The input is a local export of the property management system with one
+row per room and night, as CSV:
+
+    room_id,date,available,price
+    room-2,2026-12-24,1,549
+    room-2,2026-12-25,0,
+
+or as an SQLite database with an ``availability`` table of the same
+columns. A night without a row is available at the room's catalog price,
+and so is a blank ``available`` or ``price``.
+
+Each catalog room gets data/calendar/<room id>/index.json, which maps every
+month with rows to a version hash, and one <YYYY-MM>.json shard per month:
+
+    {"a": 2147483631, "p": [399, 0, 0, 150, 0, -150, ...]}
+
+``a`` is the availability bitmap (bit d - 1 is day d of the month) and
+``p`` the nightly prices, the first in full and each following one as the
+difference to the night before, so a run of equal rates is a run of zeros.
+js/booking.js fetches the index of the room being booked and then only the
+months the chosen stay spans, with ?v=<version> so a shard can be cached
+until it changes.
+
+A shard is only re-encoded when its rows or the room's catalog price
+changed; the caller keeps the input hashes between builds.
+"""
+
+import calendar
+import csv
+import datetime
+import hashlib
+import json
+import os
+import sqlite3
+from urllib.request import pathname2url
+
+CALENDAR_VERSION = 1
+INDEX_FILE = 'index.json'
+
+_TRUE = {'', '1', 'true', 'yes', 'y'}
+_FALSE = {'0', 'false', 'no', 'n'}
+
+
+def _compact_json(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _read_rows(path):
+    # Yields (line or row number, room_id, date, available, price) as strings
+    if path.endswith('.csv'):
+        with open(path, encoding='utf-8', newline='') as f:
+            reader = csv.DictReader(f)
+            try:
+                missing = {'room_id', 'date'} - set(reader.fieldnames or ())
+                if missing:
+                    raise ValueError(f"{path}: missing column(s) {', '.join(sorted(missing))}")
+                for row in reader:
+                    # A short row leaves its missing fields None
+                    yield (reader.line_num, row['room_id'] or '', row['date'] or '',
+                           row.get('available') or '', row.get('price') or '')
+            except csv.Error as exc:
+                raise ValueError(f'{path}:{reader.line_num}: {exc}') from None
+        return
+    try:
+        # Quoted, so a '?' or '#' in the path isn't read as part of the URI
+        connection = sqlite3.connect(f'file:{pathname2url(os.path.abspath(path))}?mode=ro',
+                                     uri=True)
+        try:
+            query = 'SELECT rowid, room_id, date, available, price FROM availability'
+            for values in connection.execute(query):
+                yield tuple('' if value is None else str(value) for value in values)
+        finally:
+            connection.close()
+    except sqlite3.Error as exc:
+        raise ValueError(f'{path}: {exc}') from None
+
+
+def load_availability(path):
+    """Read a PMS export into {(room id, 'YYYY-MM'): {day: (available, price)}}.
+
+    price is None where the row leaves it blank.
+    """
+    months = {}
+    for line, room_id, date, available, price in _read_rows(path):
+        where = f'{path}:{line}'
+        try:
+            night = datetime.date.fromisoformat(date.strip())
+        except ValueError:
+            raise ValueError(f'{where}: bad date {date!r}') from None
+        flag = available.strip().lower()
+        if flag not in _TRUE and flag not in _FALSE:
+            raise ValueError(f'{where}: bad available value {available!r}')
+        amount = None
+        if price.strip():
+            try:
+                amount = float(price)
+            except ValueError:
+                raise ValueError(f'{where}: bad price {price!r}') from None
+            if not amount.is_integer() or amount < 0:
+                raise ValueError(f'{where}: prices must be whole amounts, got {price!r}')
+            amount = int(amount)
+        nights = months.setdefault((room_id.strip(), f'{night:%Y-%m}'), {})
+        if night.day in nights:
+            raise ValueError(f'{where}: duplicate row for {room_id} on {night}')
+        nights[night.day] = (flag in _TRUE, amount)
+    return months
+
+
+def encode_month(month, nights, base_price):
+    """The shard bytes for one room and month."""
+    year, number = map(int, month.split('-'))
+    bits = 0
+    prices = []
+    for day in range(1, calendar.monthrange(year, number)[1] + 1):
+        available, price = nights.get(day, (True, None))
+        if available:
+            bits |= 1 << (day - 1)
+        prices.append(base_price if price is None else price)
+    deltas = prices[:1] + [b - a for a, b in zip(prices, prices[1:])]
+    return _compact_json({'a': bits, 'p': deltas})
+
+
+def _input_hash(nights, base_price):
+    data = _compact_json([CALENDAR_VERSION, base_price, sorted(nights.items())])
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_calendar(room_list, months, out_dir, write, state, force=False, prune=True):
+    """Write every room's calendar index and month shards through write(path, bytes).
+
+    months comes from load_availability. state maps '<room id>/<month>' to
+    the [input hash, shard version] of the previous build and is updated in
+    place; a shard whose input hash is unchanged is not re-encoded unless
+    force is set. Returns (encoded, ignored): the number of shards encoded
+    and the number of rows for rooms missing from the catalog.
+    """
+    prices = {room['id']: room['price'] for room in room_list}
+    indexes = {room_id: {} for room_id in prices}
+    encoded = ignored = 0
+    expected = set()
+    new_state = {}
+    for (room_id, month), nights in sorted(months.items()):
+        if room_id not in prices:
+            ignored += len(nights)
+            continue
+        key = f'{room_id}/{month}'
+        path = os.path.join(out_dir, room_id, f'{month}.json')
+        input_hash = _input_hash(nights, prices[room_id])
+        previous = state.get(key)
+        if force or not previous or previous[0] != input_hash or not os.path.exists(path):
+            data = encode_month(month, nights, prices[room_id])
+            write(path, data)
+            previous = [input_hash, hashlib.sha256(data).hexdigest()[:10]]
+            encoded += 1
+        new_state[key] = previous
+        indexes[room_id][month] = previous[1]
+        expected.add(path)
+
+    for room_id, index in indexes.items():
+        path = os.path.join(out_dir, room_id, INDEX_FILE)
+        write(path, _compact_json({'version': CALENDAR_VERSION, 'months': index}))
+        expected.add(path)
+    state.clear()
+    state.update(new_state)
+
+    if prune and os.path.isdir(out_dir):
+        # Rooms leave the catalog and months fall out of the export
+        for room_id in os.listdir(out_dir):
+            room_dir = os.path.join(out_dir, room_id)
+            for entry in os.listdir(room_dir):
+                path = os.path.join(room_dir, entry)
+                if path not in expected:
+                    os.remove(path)
+            if not os.listdir(room_dir):
+                os.rmdir(room_dir)
+    return encoded, ignored
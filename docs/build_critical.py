@@ -0,0 +1,146 @@
+"""Critical CSS extraction for the generated room pages.
+
+Given the full stylesheet and the markup of a page's first screen, keeps
+only the rules whose selectors could match that markup: every class, id
+and element name in the selector has to appear in it. Relationships between
+elements are not checked, so the result is a superset of what the first
+screen needs, which is the safe direction. @media/@supports blocks are
+filtered recursively, @font-face is kept and @keyframes are kept only when
+a kept rule animates with them.
+
+The page inlines the result and loads the full stylesheet asynchronously.
+"""
+
+import re
+
+_CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*(["\'])(.*?)\1', re.S)
+_ID_ATTR_RE = re.compile(r'\bid\s*=\s*(["\'])(.*?)\1', re.S)
+_TAG_RE = re.compile(r'<([a-zA-Z][\w-]*)')
+
+_SELECTOR_TOKEN_RE = re.compile(r'''
+    \.(?P<cls>(?:\\[0-9a-fA-F]{1,6}\s?|\\.|[\w-])+)
+  | \#(?P<id>(?:\\[0-9a-fA-F]{1,6}\s?|\\.|[\w-])+)
+  | \[[^\]]*\]
+  | ::?[\w-]+(?:\([^)]*\))?
+  | (?P<tag>[a-zA-Z][\w-]*)
+  | .
+''', re.X | re.S)
+_ESCAPE_RE = re.compile(r'\\([0-9a-fA-F]{1,6})\s?|\\(.)', re.S)
+_KEYFRAMES_RE = re.compile(r'@(?:-webkit-)?keyframes\s+([\w-]+)')
+
+
+def _unescape(name):
+    return _ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 16)) if m.group(1) else m.group(2), name)
+
+
+def used_names(html):
+    """Classes, ids and element names appearing in the markup."""
+    classes = set()
+    for match in _CLASS_ATTR_RE.finditer(html):
+        classes.update(match.group(2).split())
+    ids = {match.group(2).strip() for match in _ID_ATTR_RE.finditer(html)}
+    tags = {tag.lower() for tag in _TAG_RE.findall(html)} | {'html', 'body'}
+    return classes, ids, tags
+
+
+def parse_rules(css):
+    """Split CSS into top-level (prelude, body) pairs.
+
+    Statements without a block (@import, @charset) have a body of None.
+    """
+    rules = []
+    i = 0
+    n = len(css)
+    depth = 0
+    start = 0
+    body_start = 0
+    while i < n:
+        c = css[i]
+        if c in '"\'':
+            j = i + 1
+            while j < n and css[j] != c:
+                j += 2 if css[j] == '\\' else 1
+            i = j + 1
+            continue
+        if css.startswith('/*', i):
+            end = css.find('*/', i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        if c == '{':
+            if depth == 0:
+                prelude = css[start:i].strip()
+                body_start = i + 1
+            depth += 1
+        elif c == '}':
+            depth -= 1
+            if depth == 0:
+                rules.append((prelude, css[body_start:i]))
+                start = i + 1
+        elif c == ';' and depth == 0:
+            statement = css[start:i].strip()
+            if statement:
+                rules.append((statement, None))
+            start = i + 1
+        i += 1
+    return rules
+
+
+def _split_selectors(prelude):
+    parts = []
+    depth = 0
+    start = 0
+    for i, c in enumerate(prelude):
+        if c in '([':
+            depth += 1
+        elif c in ')]':
+            depth -= 1
+        elif c == ',' and depth == 0:
+            parts.append(prelude[start:i].strip())
+            start = i + 1
+    parts.append(prelude[start:].strip())
+    return parts
+
+
+def selector_matches(selector, used):
+    classes, ids, tags = used
+    for match in _SELECTOR_TOKEN_RE.finditer(selector):
+        if match.group('cls') and _unescape(match.group('cls')) not in classes:
+            return False
+        if match.group('id') and _unescape(match.group('id')) not in ids:
+            return False
+        if match.group('tag') and match.group('tag').lower() not in tags:
+            return False
+    return True
+
+
+def _filter_rules(rules, used, keyframes):
+    out = []
+    for prelude, body in rules:
+        if body is None:
+            out.append(prelude + ';')
+        elif prelude.startswith('@'):
+            keyword = prelude.split(None, 1)[0].split('(', 1)[0].lower()
+            if keyword in ('@media', '@supports'):
+                inner = _filter_rules(parse_rules(body), used, keyframes)
+                if inner:
+                    out.append(f'{prelude}{{{inner}}}')
+            elif keyword.endswith('keyframes'):
+                match = _KEYFRAMES_RE.match(prelude)
+                if match:
+                    keyframes[match.group(1)] = f'{prelude}{{{body}}}'
+            else:
+                out.append(f'{prelude}{{{body}}}')
+        else:
+            kept = [s for s in _split_selectors(prelude) if selector_matches(s, used)]
+            if kept:
+                out.append(f"{','.join(kept)}{{{body}}}")
+    return ''.join(out)
+
+
+def critical_css(css, html):
+    """The rules of css that can apply to html, in their original order."""
+    keyframes = {}
+    kept = _filter_rules(parse_rules(css), used_names(html), keyframes)
+    animations = [frames for name, frames in keyframes.items()
+                  if re.search(rf'(?<![\w-]){re.escape(name)}(?![\w-])', kept)]
+    return kept + ''.join(animations)
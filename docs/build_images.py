@@ -0,0 +1,233 @@
+"""Responsive image stage for the site generator.
+
+A catalog room may name a source photo (``"image": "images/rooms/x.jpg"``,
+relative to the site root). Each source is resized to the widths in
+IMAGE_WIDTHS and encoded as AVIF, WebP and JPEG; pages reference the
+variants through <picture> srcset/sizes with explicit width/height, so the
+browser reserves the space before the image arrives.
+
+Encoded variants are cached under .build-cache/images, keyed by the source
+hash, target width, format and quality, so an unchanged photo is never
+re-encoded. Cache misses are encoded across a pool of worker processes.
+
+Encoding needs the optional Pillow package, which works offline; AVIF
+also needs a Pillow built with libavif (or the pillow-avif-plugin package).
+Without Pillow the source file is linked as is, still with its intrinsic
+width/height, which the header parser below reads in pure Python.
+"""
+
+import hashlib
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional dependency
+    Image = None
+
+try:
+    import pillow_avif  # noqa: F401  registers AVIF with older Pillow releases
+except ImportError:
+    pass
+
+# Output widths in CSS pixels; a source is never upscaled
+IMAGE_WIDTHS = (400, 800, 1200, 1600)
+# Width of the variant used for the <img src> fallback
+FALLBACK_WIDTH = 800
+
+# (extension, MIME type, Pillow format, quality), best compression first;
+# the last entry is the <img> fallback every browser can decode
+FORMATS = (
+    ('avif', 'image/avif', 'AVIF', 50),
+    ('webp', 'image/webp', 'WEBP', 75),
+    ('jpg', 'image/jpeg', 'JPEG', 80),
+)
+
+# Variants are written here, relative to the site root, under fingerprinted names
+OUTPUT_DIR = 'images/generated'
+
+# Bump to invalidate every cached variant (e.g. after changing resampling)
+CACHE_VERSION = 1
+
+_SAVE_OPTIONS = {
+    'AVIF': {},
+    'WEBP': {'method': 6},
+    'JPEG': {'optimize': True, 'progressive': True},
+}
+
+
+def available_formats():
+    """The entries of FORMATS this Pillow can encode; empty without Pillow."""
+    if Image is None:
+        return ()
+    Image.init()
+    return tuple(fmt for fmt in FORMATS if fmt[2] in Image.SAVE)
+
+
+# Pure-Python size reader
+
+# JPEG start-of-frame markers (SOF0-SOF15 minus DHT, JPG and DAC)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# EXIF orientations that swap width and height
+_TRANSPOSED = {5, 6, 7, 8}
+
+
+def image_size(path):
+    """Return (width, height) of a PNG, GIF, JPEG or WebP file from its header."""
+    with open(path, 'rb') as f:
+        head = f.read(30)
+        if head.startswith(b'\x89PNG\r\n\x1a\n'):
+            return struct.unpack('>II', head[16:24])
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            return struct.unpack('<HH', head[6:10])
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8X':
+                return (1 + int.from_bytes(head[24:27], 'little'),
+                        1 + int.from_bytes(head[27:30], 'little'))
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                return width & 0x3FFF, height & 0x3FFF
+            if chunk == b'VP8L':
+                bits = int.from_bytes(head[21:25], 'little')
+                return 1 + (bits & 0x3FFF), 1 + ((bits >> 14) & 0x3FFF)
+        if head.startswith(b'\xff\xd8'):
+            f.seek(2)
+            while True:
+                byte = f.read(1)
+                if not byte:
+                    break
+                if byte != b'\xff':
+                    continue
+                marker = f.read(1)
+                while marker == b'\xff':  # fill bytes
+                    marker = f.read(1)
+                if not marker:
+                    break
+                code = marker[0]
+                if code == 0x01 or 0xD0 <= code <= 0xD8:  # markers without a length
+                    continue
+                length = struct.unpack('>H', f.read(2))[0]
+                if code in _JPEG_SOF:
+                    height, width = struct.unpack('>xHH', f.read(5))
+                    return width, height
+                f.seek(length - 2, os.SEEK_CUR)
+    raise ValueError(f'{path}: not a PNG, GIF, JPEG or WebP image')
+
+
+def _oriented_size(path):
+    # Pillow is lazy here: only the header and EXIF block are read
+    if Image is None:
+        return image_size(path)
+    with Image.open(path) as im:
+        width, height = im.size
+        if im.getexif().get(0x0112) in _TRANSPOSED:
+            width, height = height, width
+    return width, height
+
+
+# Encoding
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def target_widths(width):
+    """Variant widths for a source width, never wider than the source."""
+    widths = [w for w in IMAGE_WIDTHS if w < width]
+    widths.append(min(width, IMAGE_WIDTHS[-1]))
+    return widths
+
+
+def _encode_variant(job):
+    source_path, cache_path, size, pil_format, quality = job
+    with Image.open(source_path) as im:
+        im = ImageOps.exif_transpose(im)
+        if pil_format == 'JPEG' and im.mode not in ('RGB', 'L'):
+            im = im.convert('RGB')
+        im = im.resize(size, Image.LANCZOS)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        im.save(tmp_path, pil_format, quality=quality, **_SAVE_OPTIONS[pil_format])
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+def build_images(site_dir, sources, cache_dir, write, jobs=1, prune=True):
+    """Resize and encode every source image, reusing cached variants.
+
+    sources are paths relative to site_dir. write(path, bytes) is the
+    generator's output writer. Returns (pictures, encoded): pictures maps
+    each source to a dict with the intrinsic 'width'/'height', the fallback
+    'src'/'srcset' and a list of (MIME type, srcset) 'sources' for the
+    other formats; encoded is the number of variants that were not cached.
+    """
+    formats = available_formats()
+    pictures = {}
+    variants = []  # (output path, cache path)
+    work = []
+    for source in sorted(set(sources)):
+        source_path = os.path.join(site_dir, source)
+        width, height = _oriented_size(source_path)
+        if not formats:
+            pictures[source] = {'width': width, 'height': height, 'src': source,
+                                'srcset': f'{source} {width}w', 'sources': []}
+            continue
+
+        digest = _file_sha256(source_path)
+        stem = os.path.splitext(os.path.basename(source))[0]
+        widths = target_widths(width)
+        fallback_width = max([w for w in widths if w <= FALLBACK_WIDTH] or widths[:1])
+        srcsets = {}
+        for ext, mime, pil_format, quality in formats:
+            entries = []
+            for w in widths:
+                size = (w, max(1, round(height * w / width)))
+                key = f'{CACHE_VERSION}-{digest}-{w}-{pil_format}-q{quality}'
+                cache_path = os.path.join(cache_dir, f'{hashlib.sha256(key.encode()).hexdigest()}.{ext}')
+                url = f'{OUTPUT_DIR}/{stem}-{w}w.{digest[:10]}.{ext}'
+                if not os.path.exists(cache_path):
+                    work.append((source_path, cache_path, size, pil_format, quality))
+                variants.append((os.path.join(site_dir, url), cache_path))
+                entries.append(f'{url} {w}w')
+                if w == fallback_width and mime == formats[-1][1]:
+                    fallback = url
+            srcsets[mime] = ', '.join(entries)
+        fallback_mime = formats[-1][1]
+        pictures[source] = {
+            'width': width,
+            'height': height,
+            'src': fallback,
+            'srcset': srcsets.pop(fallback_mime),
+            'sources': list(srcsets.items()),
+        }
+
+    if work:
+        os.makedirs(cache_dir, exist_ok=True)
+        if jobs > 1 and len(work) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                list(pool.map(_encode_variant, work))
+        else:
+            for job in work:
+                _encode_variant(job)
+
+    for output_path, cache_path in variants:
+        with open(cache_path, 'rb') as f:
+            write(output_path, f.read())
+    if prune:
+        _prune_variants(os.path.join(site_dir, OUTPUT_DIR), {path for path, _ in variants})
+    return pictures, len(work)
+
+
+def _prune_variants(output_dir, keep):
+    # Drop variants of images that changed or left the catalog
+    if not os.path.isdir(output_dir):
+        return
+    for entry in os.listdir(output_dir):
+        path = os.path.join(output_dir, entry)
+        if path not in keep:
+            os.remove(path)
@@ -0,0 +1,189 @@
+"""Output layer for the site generator.
+
+Every file the build produces goes through OutputWriter. Content is
+streamed chunk by chunk into a temporary file in the target directory,
+fsynced and then renamed over the live file, so a reader (or a deploy
+syncing the tree) never sees a half-written page. Precompressed .gz/.br
+siblings are encoded from the same stream. Nothing is written when the
+new bytes hash the same as the file already on disk.
+
+In dry-run mode nothing touches the disk at all; the writer only records
+the sha256 of what it would have written, for diffing builds in CI.
+"""
+
+import hashlib
+import os
+import tempfile
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+# Every precompressed sibling a build can leave next to an output, and the
+# ones this interpreter can write
+SIBLING_SUFFIXES = ('.gz', '.br')
+ENCODINGS = SIBLING_SUFFIXES if brotli is not None else ('.gz',)
+
+
+class StreamResult:
+    """Outcome of one streamed write."""
+
+    def __init__(self, sha256, size, compressed_sizes, written):
+        self.sha256 = sha256
+        self.size = size
+        # {'.gz': bytes, '.br': bytes} for the encodings that were produced
+        self.compressed_sizes = compressed_sizes
+        self.written = written
+
+
+class _GzipEncoder:
+    # zlib with wbits=31 emits a gzip stream with a zero mtime, so output
+    # is reproducible
+    def __init__(self):
+        self._compressor = zlib.compressobj(9, zlib.DEFLATED, 31)
+
+    def process(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=11)
+
+    def process(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def encoders():
+    """Streaming encoders for each available precompressed encoding."""
+    classes = {'.gz': _GzipEncoder, '.br': _BrotliEncoder}
+    return {suffix: classes[suffix]() for suffix in ENCODINGS}
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.hexdigest()
+
+
+def siblings_current(path):
+    """Whether exactly the precompressed siblings this build would write exist."""
+    return all(os.path.exists(path + suffix) == (suffix in ENCODINGS)
+               for suffix in SIBLING_SUFFIXES)
+
+
+def _fsync_dir(directory):
+    # Make the rename itself durable; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class OutputWriter:
+    """Writes build outputs atomically, or only hashes them in dry-run mode."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        # path -> sha256 of every file written (or that would be written)
+        self.hashes = {}
+        # paths whose content actually changed on disk
+        self.written = set()
+
+    def __call__(self, path, data):
+        """Write bytes to path unless it already holds exactly those bytes.
+
+        Returns True if the file was (or in dry-run mode, would be) written.
+        """
+        return self.stream(path, [data], unchanged_hash=file_sha256(path)).written
+
+    def stream(self, path, chunks, compress=False, unchanged_hash=None):
+        """Stream str/bytes chunks into path and, with compress, its .gz/.br siblings.
+
+        If the content hashes to unchanged_hash, the temporary files are
+        discarded and the live files are left untouched. Either way, a
+        compressed stream removes the siblings of encodings that are not
+        available, which an older build may have left behind.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        active = encoders() if compress else {}
+        compressed_sizes = dict.fromkeys(active, 0)
+        directory = os.path.dirname(path)
+
+        files = {}
+        if not self.dry_run:
+            os.makedirs(directory, exist_ok=True)
+            for suffix in [''] + list(active):
+                fd, tmp_path = tempfile.mkstemp(
+                    dir=directory, prefix=f'.{os.path.basename(path)}{suffix}.', suffix='.tmp')
+                files[suffix] = (os.fdopen(fd, 'wb'), tmp_path)
+
+        try:
+            for chunk in chunks:
+                data = chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+                if not data:
+                    continue
+                digest.update(data)
+                size += len(data)
+                if files:
+                    files[''][0].write(data)
+                for suffix, encoder in active.items():
+                    encoded = encoder.process(data)
+                    compressed_sizes[suffix] += len(encoded)
+                    if files and encoded:
+                        files[suffix][0].write(encoded)
+            for suffix, encoder in active.items():
+                encoded = encoder.finish()
+                compressed_sizes[suffix] += len(encoded)
+                if files:
+                    files[suffix][0].write(encoded)
+
+            sha256 = digest.hexdigest()
+            changed = sha256 != unchanged_hash
+            if files and changed:
+                for f, tmp_path in files.values():
+                    f.flush()
+                    os.fsync(f.fileno())
+                    f.close()
+                    os.chmod(tmp_path, 0o644)
+                for suffix, (_, tmp_path) in files.items():
+                    os.replace(tmp_path, path + suffix)
+                _fsync_dir(directory)
+                files = {}
+                self.written.add(path)
+        finally:
+            for f, tmp_path in files.values():
+                f.close()
+                os.remove(tmp_path)
+
+        if compress:
+            # Nothing says such a sibling was encoded from these bytes
+            for suffix in SIBLING_SUFFIXES:
+                if suffix not in active:
+                    self.remove(path + suffix)
+        self.hashes[path] = sha256
+        return StreamResult(sha256, size, compressed_sizes, changed)
+
+    def remove(self, path):
+        if not self.dry_run and os.path.exists(path):
+            os.remove(path)
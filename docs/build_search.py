@@ -0,0 +1,96 @@
+"""Precomputed room search index for client-side filtering.
+
+Rooms are numbered by their position in the catalog (which is also the order
+of the cards on rooms/index.html), and every filter is answered with bitsets
+over those positions, so the browser never scans RoomData or rebuilds cards:
+
+    index.json          header: room count, price range, capacities, amenity
+                        names and which shard holds each, plus a version hash
+    ids.json            room ids by position
+    price.json          prices sorted ascending and the matching positions;
+                        a price range is two binary searches
+    capacity.json       for each distinct maxGuests value c, the bitset of
+                        rooms sleeping at least c guests
+    amenities-<n>.json  one bitset per amenity, AMENITIES_PER_SHARD per file
+
+Only the header is needed to draw the filter controls; js/room-search.js
+fetches the other shards the first time a query needs them. Bitsets are
+base64 of a little-endian bit array (bit i of byte i >> 3 is room i).
+"""
+
+import base64
+import hashlib
+import json
+import os
+
+INDEX_VERSION = 1
+AMENITIES_PER_SHARD = 16
+HEADER_FILE = 'index.json'
+
+
+def _compact_json(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def bitset(positions, count):
+    bits = bytearray((count + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode('ascii')
+
+
+def build_search_index(room_list):
+    """Return {file name: bytes} for the header and every shard."""
+    count = len(room_list)
+    shards = {}
+
+    shards['ids.json'] = [room['id'] for room in room_list]
+
+    order = sorted(range(count), key=lambda i: (room_list[i]['price'], i))
+    shards['price.json'] = {
+        'prices': [room_list[i]['price'] for i in order],
+        'order': order,
+    }
+
+    capacities = sorted({room['maxGuests'] for room in room_list})
+    shards['capacity.json'] = {
+        'capacities': capacities,
+        'atLeast': [bitset([i for i, room in enumerate(room_list) if room['maxGuests'] >= c], count)
+                    for c in capacities],
+    }
+
+    by_amenity = {}
+    for i, room in enumerate(room_list):
+        for amenity in room['amenities']:
+            by_amenity.setdefault(amenity, []).append(i)
+    amenities = sorted(by_amenity)
+    for start in range(0, len(amenities), AMENITIES_PER_SHARD):
+        names = amenities[start:start + AMENITIES_PER_SHARD]
+        shard = f'amenities-{start // AMENITIES_PER_SHARD}.json'
+        shards[shard] = {name: bitset(by_amenity[name], count) for name in names}
+
+    files = {name: _compact_json(data) for name, data in shards.items()}
+    version = hashlib.sha256(b''.join(files[name] for name in sorted(files))).hexdigest()[:10]
+    prices = shards['price.json']['prices']
+    files[HEADER_FILE] = _compact_json({
+        'version': INDEX_VERSION,
+        'build': version,
+        'count': count,
+        'priceRange': [prices[0], prices[-1]] if prices else [0, 0],
+        'capacities': capacities,
+        'amenities': amenities,
+        'amenityShardSize': AMENITIES_PER_SHARD,
+    })
+    return files
+
+
+def write_search_index(room_list, out_dir, write, prune=True):
+    """Write the index through write(path, bytes); returns the number of files written."""
+    files = build_search_index(room_list)
+    written = sum(bool(write(os.path.join(out_dir, name), data)) for name, data in files.items())
+    if prune and os.path.isdir(out_dir):
+        # Amenity shards disappear when the catalog loses amenities
+        for entry in os.listdir(out_dir):
+            if entry not in files:
+                os.remove(os.path.join(out_dir, entry))
+    return written
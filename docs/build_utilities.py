@@ -0,0 +1,519 @@
+"""Build-time replacement for the Tailwind CDN script.
+
+Scans the templates, hand-written pages and scripts for class names, emits
+CSS for the Tailwind utilities among them and merges that with main.css and
+responsive.css into a single css/site.css. Everything runs offline: the
+utility definitions below cover the subset of Tailwind v3 this site uses
+(spacing, sizing, flex/grid, typography, colours, borders, shadows, rings,
+gradients, transitions) plus the sm/md/lg/xl/2xl, hover and focus variants.
+
+Class names that are neither a known utility nor defined in our own
+stylesheets are reported, so a new utility shows up in the build log rather
+than as a silently unstyled element.
+"""
+
+import os
+import re
+
+# Files whose class names the stylesheet has to cover, relative to the site root
+CLASS_SOURCES = (
+    'templates',
+    'index.html',
+    'location.html',
+    'js/booking.js',
+    'js/navigation.js',
+)
+
+BASE_STYLESHEETS = ('css/main.css', 'css/responsive.css')
+OUTPUT = 'css/site.css'
+
+BREAKPOINTS = {'sm': 640, 'md': 768, 'lg': 1024, 'xl': 1280, '2xl': 1536}
+PSEUDO_VARIANTS = ('hover', 'focus')
+
+COLORS = {
+    'gray': ['#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827'],
+    'red': ['#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d'],
+    'yellow': ['#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12'],
+    'green': ['#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d'],
+    'blue': ['#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a'],
+    'indigo': ['#eef2ff', '#e0e7ff', '#c7d2fe', '#a5b4fc', '#818cf8', '#6366f1', '#4f46e5', '#4338ca', '#3730a3', '#312e81'],
+    'purple': ['#faf5ff', '#f3e8ff', '#e9d5ff', '#d8b4fe', '#c084fc', '#a855f7', '#9333ea', '#7e22ce', '#6b21a8', '#581c87'],
+}
+SHADES = ('50', '100', '200', '300', '400', '500', '600', '700', '800', '900')
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'),
+    '6xl': ('3.75rem', '1'),
+}
+FONT_WEIGHTS = {
+    'thin': '100', 'light': '300', 'normal': '400', 'medium': '500',
+    'semibold': '600', 'bold': '700', 'extrabold': '800', 'black': '900',
+}
+MAX_WIDTHS = {
+    'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem',
+    '2xl': '42rem', '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem',
+    '7xl': '80rem', 'full': '100%', 'none': 'none',
+}
+RADII = {
+    'none': '0px', 'sm': '0.125rem', '': '0.25rem', 'md': '0.375rem', 'lg': '0.5rem',
+    'xl': '0.75rem', '2xl': '1rem', '3xl': '1.5rem', 'full': '9999px',
+}
+SHADOWS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    '2xl': '0 25px 50px -12px rgb(0 0 0 / 0.25)',
+    'none': '0 0 #0000',
+}
+TRANSITIONS = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, '
+        'opacity, box-shadow, transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+GRADIENT_DIRECTIONS = {
+    't': 'to top', 'tr': 'to top right', 'r': 'to right', 'br': 'to bottom right',
+    'b': 'to bottom', 'bl': 'to bottom left', 'l': 'to left', 'tl': 'to top left',
+}
+SIDES = {
+    '': ('',), 'x': ('-left', '-right'), 'y': ('-top', '-bottom'),
+    't': ('-top',), 'r': ('-right',), 'b': ('-bottom',), 'l': ('-left',),
+}
+
+STATIC = {
+    'block': 'display:block', 'inline-block': 'display:inline-block', 'inline': 'display:inline',
+    'flex': 'display:flex', 'inline-flex': 'display:inline-flex', 'grid': 'display:grid',
+    'hidden': 'display:none',
+    'static': 'position:static', 'fixed': 'position:fixed', 'absolute': 'position:absolute',
+    'relative': 'position:relative', 'sticky': 'position:sticky',
+    'flex-row': 'flex-direction:row', 'flex-col': 'flex-direction:column',
+    'flex-wrap': 'flex-wrap:wrap', 'flex-1': 'flex:1 1 0%', 'flex-auto': 'flex:1 1 auto',
+    'flex-none': 'flex:none', 'shrink-0': 'flex-shrink:0',
+    'items-start': 'align-items:flex-start', 'items-center': 'align-items:center',
+    'items-end': 'align-items:flex-end', 'items-stretch': 'align-items:stretch',
+    'justify-start': 'justify-content:flex-start', 'justify-center': 'justify-content:center',
+    'justify-end': 'justify-content:flex-end', 'justify-between': 'justify-content:space-between',
+    'justify-around': 'justify-content:space-around',
+    'text-left': 'text-align:left', 'text-center': 'text-align:center', 'text-right': 'text-align:right',
+    'uppercase': 'text-transform:uppercase', 'italic': 'font-style:italic',
+    'underline': 'text-decoration-line:underline', 'no-underline': 'text-decoration-line:none',
+    'truncate': 'overflow:hidden;text-overflow:ellipsis;white-space:nowrap',
+    'whitespace-nowrap': 'white-space:nowrap',
+    'object-cover': 'object-fit:cover', 'object-contain': 'object-fit:contain',
+    'cursor-pointer': 'cursor:pointer', 'cursor-not-allowed': 'cursor:not-allowed',
+    'outline-none': 'outline:2px solid transparent;outline-offset:2px',
+    'list-none': 'list-style-type:none', 'list-disc': 'list-style-type:disc',
+    'w-full': 'width:100%', 'w-auto': 'width:auto', 'w-screen': 'width:100vw',
+    'h-full': 'height:100%', 'h-auto': 'height:auto', 'h-screen': 'height:100vh',
+    'min-h-screen': 'min-height:100vh', 'mx-auto': 'margin-left:auto;margin-right:auto',
+    'border-transparent': 'border-color:transparent',
+    'sr-only': 'position:absolute;width:1px;height:1px;padding:0;margin:-1px;overflow:hidden;'
+               'clip:rect(0, 0, 0, 0);white-space:nowrap;border-width:0',
+}
+for _value in ('auto', 'hidden', 'scroll', 'visible'):
+    STATIC[f'overflow-{_value}'] = f'overflow:{_value}'
+    STATIC[f'overflow-x-{_value}'] = f'overflow-x:{_value}'
+    STATIC[f'overflow-y-{_value}'] = f'overflow-y:{_value}'
+
+# Tailwind preflight (v3), trimmed to the rules that matter for this site, plus
+# the custom-property defaults the shadow, ring and gradient utilities rely on
+PREFLIGHT = '''*, ::before, ::after {
+    box-sizing: border-box; border-width: 0; border-style: solid; border-color: #e5e7eb;
+    --tw-ring-offset-width: 0px; --tw-ring-offset-color: #fff;
+    --tw-ring-color: rgb(59 130 246 / 0.5);
+    --tw-ring-offset-shadow: 0 0 #0000; --tw-ring-shadow: 0 0 #0000; --tw-shadow: 0 0 #0000;
+}
+html {
+    line-height: 1.5; -webkit-text-size-adjust: 100%; tab-size: 4;
+    font-family: ui-sans-serif, system-ui, -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, "Noto Sans", sans-serif;
+}
+body { margin: 0; line-height: inherit; }
+hr { height: 0; color: inherit; border-top-width: 1px; }
+h1, h2, h3, h4, h5, h6 { font-size: inherit; font-weight: inherit; }
+a { color: inherit; text-decoration: inherit; }
+b, strong { font-weight: bolder; }
+button, input, optgroup, select, textarea {
+    font-family: inherit; font-size: 100%; font-weight: inherit; line-height: inherit;
+    color: inherit; margin: 0; padding: 0;
+}
+button, select { text-transform: none; }
+button, [type="button"], [type="reset"], [type="submit"] {
+    -webkit-appearance: button; background-color: transparent; background-image: none;
+}
+blockquote, dl, dd, h1, h2, h3, h4, h5, h6, hr, figure, p, pre { margin: 0; }
+fieldset { margin: 0; padding: 0; }
+ol, ul, menu { list-style: none; margin: 0; padding: 0; }
+textarea { resize: vertical; }
+input::placeholder, textarea::placeholder { opacity: 1; color: #9ca3af; }
+button, [role="button"] { cursor: pointer; }
+img, svg, video, canvas, audio, iframe, embed, object { display: block; vertical-align: middle; }
+img, video { max-width: 100%; height: auto; }
+[hidden] { display: none; }
+'''
+
+# Emission order, by each utility's main CSS property. This follows Tailwind's
+# plugin order so that, as with the CDN build, e.g. duration-300 overrides the
+# default duration set by transition, and bg-opacity-50 overrides bg-white.
+PROPERTY_ORDER = (
+    'position', 'top', 'right', 'bottom', 'left', 'z-index', 'grid-column',
+    'margin', 'margin-top', 'margin-right', 'margin-bottom', 'margin-left',
+    'display', 'height', 'max-height', 'min-height', 'width', 'max-width',
+    'flex', 'flex-shrink', 'cursor', 'list-style-type', 'grid-template-columns',
+    'flex-direction', 'flex-wrap', 'align-items', 'justify-content',
+    'gap', 'column-gap', 'row-gap', 'space', 'overflow', 'overflow-x', 'overflow-y',
+    'white-space', 'border-radius',
+    'border-width', 'border-top-width', 'border-right-width', 'border-bottom-width',
+    'border-left-width', 'border-color', '--tw-border-opacity',
+    'background-color', '--tw-bg-opacity', 'background-image',
+    '--tw-gradient-from', '--tw-gradient-stops', '--tw-gradient-to',
+    'object-fit', 'padding', 'padding-top', 'padding-right', 'padding-bottom',
+    'padding-left', 'text-align', 'font-size', 'font-weight', 'text-transform',
+    'font-style', 'color', '--tw-text-opacity', 'text-decoration-line', 'opacity',
+    'box-shadow', 'outline', '--tw-ring-color', 'transition-property',
+    'transition-duration',
+)
+
+_CLASS_ATTR_RE = re.compile(r'''class(?:Name)?\s*=\s*(["'`])(.*?)\1''', re.S)
+_CLASS_LIST_RE = re.compile(r'classList\.(?:add|remove|toggle)\(([^)]*)\)')
+_QUOTED_RE = re.compile(r'''["']([^"']+)["']''')
+_CLASS_NAME_RE = re.compile(r'^[a-z0-9][a-z0-9:/._-]*$', re.I)
+_SELECTOR_CLASS_RE = re.compile(r'\.((?:\\.|[\w-])+)')
+
+
+def _spacing(value):
+    """Tailwind spacing scale: 4 -> 1rem, 0.5 -> 0.125rem, px -> 1px."""
+    if value == 'px':
+        return '1px'
+    if value == '0':
+        return '0px'
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    if number < 0 or number * 4 != int(number * 4):
+        return None
+    return f'{number / 4:g}rem'
+
+
+def _color(name):
+    """Return (r, g, b, alpha) for 'blue-600', 'white', 'black/50'..., or None."""
+    alpha = None
+    if '/' in name:
+        name, _, opacity = name.partition('/')
+        if not opacity.isdigit():
+            return None
+        alpha = int(opacity) / 100
+    if name == 'white':
+        rgb = (255, 255, 255)
+    elif name == 'black':
+        rgb = (0, 0, 0)
+    else:
+        family, _, shade = name.rpartition('-')
+        if family not in COLORS or shade not in SHADES:
+            return None
+        hex_value = COLORS[family][SHADES.index(shade)]
+        rgb = tuple(int(hex_value[i:i + 2], 16) for i in (1, 3, 5))
+    return rgb + (alpha,)
+
+
+def _color_decls(prop, var, name):
+    if name == 'transparent':
+        return f'{prop}:transparent'
+    if name == 'current':
+        return f'{prop}:currentColor'
+    color = _color(name)
+    if color is None:
+        return None
+    r, g, b, alpha = color
+    if alpha is not None or var is None:
+        return f'{prop}:rgb({r} {g} {b} / {1 if alpha is None else alpha:g})'
+    return f'{var}:1;{prop}:rgb({r} {g} {b} / var({var}))'
+
+
+def _box_shadow(shadow):
+    return (f'--tw-shadow:{shadow};box-shadow:var(--tw-ring-offset-shadow, 0 0 #0000),'
+            f'var(--tw-ring-shadow, 0 0 #0000),var(--tw-shadow)')
+
+
+def utility_declarations(name):
+    """CSS declarations for a bare utility (no variants), or None if unknown.
+
+    Returns (declarations, child_selector) where child_selector is appended
+    to the class selector (used by space-x/space-y).
+    """
+    if name in STATIC:
+        return STATIC[name], ''
+
+    match = re.fullmatch(r'space-([xy])-(.+)', name)
+    if match:
+        size = _spacing(match.group(2))
+        side = 'left' if match.group(1) == 'x' else 'top'
+        return size and (f'margin-{side}:{size}', ' > :not([hidden]) ~ :not([hidden])')
+
+    match = re.fullmatch(r'(-?)([mp])([xytrbl]?)-(.+)', name)
+    if match:
+        negative, kind, side, value = match.groups()
+        size = 'auto' if value == 'auto' and kind == 'm' else _spacing(value)
+        if size is None or (negative and (kind == 'p' or size == 'auto')):
+            return None
+        prop = 'margin' if kind == 'm' else 'padding'
+        size = f'-{size}' if negative else size
+        return ';'.join(f'{prop}{suffix}:{size}' for suffix in SIDES[side]), ''
+
+    match = re.fullmatch(r'gap(-[xy])?-(.+)', name)
+    if match:
+        size = _spacing(match.group(2))
+        prop = {None: 'gap', '-x': 'column-gap', '-y': 'row-gap'}[match.group(1)]
+        return size and (f'{prop}:{size}', '')
+
+    match = re.fullmatch(r'(w|h|min-h|max-h)-(.+)', name)
+    if match:
+        size = _spacing(match.group(2))
+        prop = {'w': 'width', 'h': 'height', 'min-h': 'min-height', 'max-h': 'max-height'}[match.group(1)]
+        return size and (f'{prop}:{size}', '')
+
+    match = re.fullmatch(r'max-w-(.+)', name)
+    if match:
+        size = MAX_WIDTHS.get(match.group(1))
+        return size and (f'max-width:{size}', '')
+
+    match = re.fullmatch(r'(inset|top|right|bottom|left)-(.+)', name)
+    if match:
+        size = _spacing(match.group(2))
+        if size is None:
+            return None
+        if match.group(1) == 'inset':
+            return f'top:{size};right:{size};bottom:{size};left:{size}', ''
+        return f'{match.group(1)}:{size}', ''
+
+    match = re.fullmatch(r'z-(\d+)', name)
+    if match:
+        return f'z-index:{match.group(1)}', ''
+
+    match = re.fullmatch(r'grid-cols-(\d+)', name)
+    if match:
+        return f'grid-template-columns:repeat({match.group(1)}, minmax(0, 1fr))', ''
+
+    match = re.fullmatch(r'col-span-(\d+)', name)
+    if match:
+        return f'grid-column:span {match.group(1)} / span {match.group(1)}', ''
+
+    match = re.fullmatch(r'text-(.+)', name)
+    if match:
+        value = match.group(1)
+        if value in FONT_SIZES:
+            size, line_height = FONT_SIZES[value]
+            return f'font-size:{size};line-height:{line_height}', ''
+        decls = _color_decls('color', '--tw-text-opacity', value)
+        return decls and (decls, '')
+
+    match = re.fullmatch(r'font-(.+)', name)
+    if match:
+        weight = FONT_WEIGHTS.get(match.group(1))
+        return weight and (f'font-weight:{weight}', '')
+
+    match = re.fullmatch(r'(bg|text|border)-opacity-(\d+)', name)
+    if match:
+        return f'--tw-{match.group(1)}-opacity:{int(match.group(2)) / 100:g}', ''
+
+    match = re.fullmatch(r'bg-gradient-to-(\w+)', name)
+    if match:
+        direction = GRADIENT_DIRECTIONS.get(match.group(1))
+        return direction and (f'background-image:linear-gradient({direction}, var(--tw-gradient-stops))', '')
+
+    match = re.fullmatch(r'(from|via|to)-(.+)', name)
+    if match:
+        color = _color(match.group(2))
+        if color is None:
+            return None
+        r, g, b, alpha = color
+        value = f'rgb({r} {g} {b} / {1 if alpha is None else alpha:g})'
+        clear = f'rgb({r} {g} {b} / 0)'
+        if match.group(1) == 'from':
+            return (f'--tw-gradient-from:{value};'
+                    f'--tw-gradient-stops:var(--tw-gradient-from), var(--tw-gradient-to, {clear})'), ''
+        if match.group(1) == 'via':
+            return (f'--tw-gradient-stops:var(--tw-gradient-from), {value}, '
+                    f'var(--tw-gradient-to, {clear})'), ''
+        return f'--tw-gradient-to:{value}', ''
+
+    match = re.fullmatch(r'bg-(.+)', name)
+    if match:
+        decls = _color_decls('background-color', '--tw-bg-opacity', match.group(1))
+        return decls and (decls, '')
+
+    match = re.fullmatch(r'border(?:-([trbl]))?(?:-(\d+))?', name)
+    if match:
+        side, width = match.groups()
+        suffix = {'t': '-top', 'r': '-right', 'b': '-bottom', 'l': '-left'}.get(side, '')
+        return f'border{suffix}-width:{width or 1}px', ''
+
+    match = re.fullmatch(r'border-(.+)', name)
+    if match:
+        decls = _color_decls('border-color', '--tw-border-opacity', match.group(1))
+        return decls and (decls, '')
+
+    match = re.fullmatch(r'rounded(?:-(.+))?', name)
+    if match:
+        radius = RADII.get(match.group(1) or '')
+        return radius and (f'border-radius:{radius}', '')
+
+    match = re.fullmatch(r'shadow(?:-(.+))?', name)
+    if match:
+        shadow = SHADOWS.get(match.group(1) or '')
+        return shadow and (_box_shadow(shadow), '')
+
+    match = re.fullmatch(r'ring(?:-(\d+))?', name)
+    if match:
+        width = match.group(1) or '3'
+        return ('--tw-ring-offset-shadow:0 0 0 var(--tw-ring-offset-width) var(--tw-ring-offset-color);'
+                f'--tw-ring-shadow:0 0 0 calc({width}px + var(--tw-ring-offset-width)) var(--tw-ring-color);'
+                'box-shadow:var(--tw-ring-offset-shadow),var(--tw-ring-shadow),var(--tw-shadow, 0 0 #0000)'), ''
+
+    match = re.fullmatch(r'ring-(.+)', name)
+    if match:
+        decls = _color_decls('--tw-ring-color', '--tw-ring-opacity', match.group(1))
+        return decls and (decls, '')
+
+    match = re.fullmatch(r'opacity-(\d+)', name)
+    if match:
+        return f'opacity:{int(match.group(1)) / 100:g}', ''
+
+    match = re.fullmatch(r'transition(?:-(.+))?', name)
+    if match:
+        props = TRANSITIONS.get(match.group(1) or '')
+        return props and (f'transition-property:{props};'
+                          'transition-timing-function:cubic-bezier(0.4, 0, 0.2, 1);'
+                          'transition-duration:150ms'), ''
+
+    match = re.fullmatch(r'duration-(\d+)', name)
+    if match:
+        return f'transition-duration:{match.group(1)}ms', ''
+
+    return None
+
+
+def _rank(decls, child):
+    if child:
+        prop = 'space'
+    else:
+        props = [d.split(':', 1)[0] for d in decls.split(';')]
+        prop = next((p for p in props if not p.startswith('--')), props[0])
+    try:
+        return PROPERTY_ORDER.index(prop)
+    except ValueError:
+        return len(PROPERTY_ORDER)
+
+
+def escape_class(name):
+    return re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+
+
+def parse_class(name):
+    """Split 'md:hover:bg-blue-700' into (breakpoint, pseudo, utility)."""
+    *variants, base = name.split(':')
+    breakpoint = pseudo = None
+    for variant in variants:
+        if variant in BREAKPOINTS and breakpoint is None:
+            breakpoint = variant
+        elif variant in PSEUDO_VARIANTS and pseudo is None:
+            pseudo = variant
+        else:
+            return None
+    return breakpoint, pseudo, base
+
+
+def generate_utilities(classes):
+    """Return (css, unknown) for the given class names.
+
+    Rules are emitted in Tailwind's order: plain utilities, then hover/focus,
+    then each breakpoint from small to large, so later rules win the same way
+    they do with the CDN build.
+    """
+    groups = {}
+    unknown = []
+    for name in sorted(classes):
+        parsed = parse_class(name)
+        result = parsed and utility_declarations(parsed[2])
+        if not result:
+            unknown.append(name)
+            continue
+        breakpoint, pseudo, _ = parsed
+        decls, child = result
+        selector = f'.{escape_class(name)}' + (f':{pseudo}' if pseudo else '') + child
+        key = (list(BREAKPOINTS).index(breakpoint) + 1 if breakpoint else 0,
+               PSEUDO_VARIANTS.index(pseudo) + 1 if pseudo else 0)
+        groups.setdefault(key, []).append((_rank(decls, child), name, f'{selector} {{ {decls} }}'))
+
+    lines = []
+    for (bp_index, _), entries in sorted(groups.items()):
+        rules = [rule for _, _, rule in sorted(entries)]
+        if bp_index:
+            width = list(BREAKPOINTS.values())[bp_index - 1]
+            lines.append(f'@media (min-width: {width}px) {{')
+            lines.extend(f'    {rule}' for rule in rules)
+            lines.append('}')
+        else:
+            lines.extend(rules)
+    return '\n'.join(lines) + '\n', unknown
+
+
+def _iter_source_files(site_dir, sources):
+    for source in sources:
+        path = os.path.join(site_dir, source)
+        if os.path.isdir(path):
+            for root, _, files in sorted(os.walk(path)):
+                for filename in sorted(files):
+                    yield os.path.join(root, filename)
+        else:
+            yield path
+
+
+def collect_classes(site_dir, sources=CLASS_SOURCES):
+    classes = set()
+    for path in _iter_source_files(site_dir, sources):
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        found = []
+        for match in _CLASS_ATTR_RE.finditer(text):
+            found.extend(match.group(2).split())
+        for match in _CLASS_LIST_RE.finditer(text):
+            for quoted in _QUOTED_RE.findall(match.group(1)):
+                found.extend(quoted.split())
+        # Skip template placeholders like ${type} or {{ name }}
+        classes.update(name for name in found if _CLASS_NAME_RE.match(name))
+    return classes
+
+
+def build_stylesheet(site_dir, write, sources=CLASS_SOURCES):
+    """Write css/site.css: main.css + responsive.css + preflight + utilities.
+
+    The preflight and utilities come last, mirroring the CDN script which
+    injected its styles after the linked stylesheets. Returns (css, unknown):
+    the stylesheet bytes, so later stages need not re-read a file a dry run
+    never wrote, and the list of class names that are neither utilities nor
+    defined in the base sheets.
+    """
+    base = []
+    for sheet in BASE_STYLESHEETS:
+        with open(os.path.join(site_dir, sheet), encoding='utf-8') as f:
+            base.append(f.read().rstrip('\n'))
+    own_classes = {c.replace('\\', '') for c in _SELECTOR_CLASS_RE.findall('\n'.join(base))}
+
+    classes = collect_classes(site_dir, sources)
+    utilities, unknown = generate_utilities(classes - own_classes)
+
+    css = '\n\n'.join(base + [
+        '/* Generated by build_utilities.py: Tailwind preflight */\n' + PREFLIGHT.rstrip('\n'),
+        '/* Generated by build_utilities.py: utilities used by the site */\n' + utilities.rstrip('\n'),
+    ]) + '\n'
+    css = css.encode('utf-8')
+    write(os.path.join(site_dir, OUTPUT), css)
+    return css, unknown
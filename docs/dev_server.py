@@ -0,0 +1,247 @@
+"""Development server for the site generator: watch, rebuild, live reload.
+
+    python generate_rooms.py --watch [--port 8000]
+
+Serves the site directory over HTTP and watches the generator's inputs. On
+a change it calls the generator's rebuild callback, which reports the
+outputs that actually changed, and browsers showing one of those pages get
+a reload pushed over Server-Sent Events. A changed stylesheet or script
+reloads every open page.
+
+The reload snippet is injected into HTML responses by this server only, so
+the files on disk stay exactly what a production build produces.
+
+Filesystem notifications come from the optional ``watchdog`` package;
+without it the watched files are polled every POLL_INTERVAL seconds.
+"""
+
+import os
+import queue
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # optional dependency
+    Observer = None
+
+POLL_INTERVAL = 0.05
+# Editors often write a file in several steps; collect them into one rebuild
+DEBOUNCE = 0.02
+RELOAD_PATH = '/__livereload'
+
+RELOAD_SNIPPET = f'''<script>
+(function() {{
+    // Injected by dev_server.py; never part of a build
+    const source = new EventSource('{RELOAD_PATH}?path=' + encodeURIComponent(location.pathname));
+    let reconnecting = false;
+    source.onmessage = () => location.reload();
+    source.onerror = () => {{ reconnecting = true; }};
+    // The server restarts when generator code changes; reload once it is back
+    source.onopen = () => {{ if (reconnecting) location.reload(); }};
+}})();
+</script>
+'''
+
+
+def page_path(url_path):
+    """Normalise a URL path to the site-relative file it serves."""
+    path = unquote(url_path).lstrip('/')
+    if not path or path.endswith('/'):
+        path += 'index.html'
+    return path
+
+
+class ReloadHub:
+    """Tracks connected browsers and the page each one is showing."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients = {}  # queue -> page path
+
+    def connect(self, path):
+        client = queue.Queue()
+        with self._lock:
+            self._clients[client] = path
+        return client
+
+    def disconnect(self, client):
+        with self._lock:
+            self._clients.pop(client, None)
+
+    def notify(self, changed):
+        """Reload the browsers affected by the changed site-relative paths."""
+        reload_all = any(path.endswith(('.css', '.js')) for path in changed)
+        with self._lock:
+            targets = [client for client, path in self._clients.items()
+                       if reload_all or path in changed]
+        for client in targets:
+            client.put('reload')
+        return len(targets)
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    hub = None
+
+    def log_message(self, format, *args):
+        pass  # the rebuild log is the interesting output
+
+    def end_headers(self):
+        self.send_header('Cache-Control', 'no-store')
+        super().end_headers()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == RELOAD_PATH:
+            self._serve_events(parse_qs(url.query).get('path', ['/'])[0])
+            return
+        if page_path(url.path).endswith('.html'):
+            self._serve_page(url.path)
+            return
+        super().do_GET()
+
+    def _serve_page(self, url_path):
+        # translate_path drops '..' segments, so a request can't leave the site
+        full_path = self.translate_path(url_path)
+        if full_path.endswith('/'):
+            full_path += 'index.html'
+        try:
+            with open(full_path, 'rb') as f:
+                body = f.read()
+        except (FileNotFoundError, IsADirectoryError):
+            self.send_error(404)
+            return
+        marker = body.rfind(b'</body>')
+        snippet = RELOAD_SNIPPET.encode('utf-8')
+        body = body[:marker] + snippet + body[marker:] if marker != -1 else body + snippet
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _serve_events(self, url_path):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'keep-alive')
+        self.end_headers()
+        client = self.hub.connect(page_path(url_path))
+        try:
+            self.wfile.write(b': connected\n\n')
+            self.wfile.flush()
+            while True:
+                try:
+                    message = client.get(timeout=15)
+                except queue.Empty:
+                    message = None
+                # Comments keep idle connections (and proxies) alive
+                self.wfile.write(f'data: {message}\n\n'.encode() if message else b': ping\n\n')
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.hub.disconnect(client)
+
+
+def _poll(paths_fn, events, stop):
+    mtimes = {}
+    first = True
+    while not stop.is_set():
+        current = {}
+        for path in paths_fn():
+            try:
+                current[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                pass
+        if not first:
+            for path in current.keys() | mtimes.keys():
+                if current.get(path) != mtimes.get(path):
+                    events.put(path)
+        mtimes = current
+        first = False
+        stop.wait(POLL_INTERVAL)
+
+
+def _walk(roots, is_source):
+    for directory, recursive in roots:
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [d for d in dirnames if recursive and not d.startswith('.')]
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if is_source(path):
+                    yield path
+
+
+def _watch_notifications(roots, events):
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if not event.is_directory:
+                events.put(os.path.abspath(event.src_path))
+                dest = getattr(event, 'dest_path', None)
+                if dest:
+                    events.put(os.path.abspath(dest))
+
+    observer = Observer()
+    for directory, recursive in roots:
+        observer.schedule(Handler(), directory, recursive=recursive)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+
+def serve(site_dir, rebuild, roots, is_source, host='127.0.0.1', port=8000):
+    """Serve site_dir and rebuild on changes until interrupted.
+
+    roots are (directory, recursive) pairs to watch; is_source(path)
+    filters events down to generator inputs.
+    rebuild(paths) receives the changed absolute paths and returns the
+    site-relative paths of the outputs it changed, or None if there was
+    nothing to rebuild.
+    """
+    hub = ReloadHub()
+    handler = partial(type('Handler', (DevRequestHandler,), {'hub': hub}), directory=site_dir)
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    events = queue.Queue()
+    stop = threading.Event()
+    if Observer is not None:
+        _watch_notifications(roots, events)
+        mode = 'filesystem notifications'
+    else:
+        threading.Thread(target=_poll, args=(partial(_walk, roots, is_source), events, stop),
+                         daemon=True).start()
+        mode = f'polling every {POLL_INTERVAL * 1000:.0f} ms (install watchdog for notifications)'
+
+    print(f'Serving {site_dir} at http://{host}:{port}/ ; watching with {mode}. Ctrl+C to stop.')
+    try:
+        while True:
+            changed = {events.get()}
+            deadline = time.monotonic() + DEBOUNCE
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    changed.add(events.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            changed = {path for path in changed if is_source(path)}
+            if not changed:
+                continue
+            start = time.perf_counter()
+            outputs = rebuild(sorted(changed))
+            if outputs is None:
+                continue  # only our own writes
+            reloaded = hub.notify(outputs)
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f'Rebuilt in {elapsed:.0f} ms: {len(outputs)} output(s) changed, '
+                  f'{reloaded} browser(s) reloaded')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.shutdown()
+        server.server_close()
@@ -1,363 +1,722 @@
 #!/usr/bin/env python3
 
+import argparse
+import functools
+import hashlib
+import inspect
+import json
 import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
 
-# Room data from booking.js
-rooms = [
-    {'id': 'room-2', 'name': 'Deluxe Ocean View', 'price': 399, 'maxGuests': 3, 'amenities': ['Queen Bed', 'Ocean View', 'Balcony', 'Mini Bar', 'Free WiFi', 'Spa Access']},
-    {'id': 'room-3', 'name': 'Presidential Suite', 'price': 599, 'maxGuests': 4, 'amenities': ['King Bed', 'Living Room', 'Kitchen', 'Balcony', 'Butler Service', 'Premium WiFi']},
-    {'id': 'room-4', 'name': 'Garden Villa', 'price': 449, 'maxGuests': 4, 'amenities': ['King Bed', 'Garden View', 'Private Patio', 'Kitchenette', 'Free WiFi', 'Pool Access']},
-    {'id': 'room-5', 'name': 'Penthouse Suite', 'price': 799, 'maxGuests': 6, 'amenities': ['Master Bedroom', 'Panoramic View', 'Full Kitchen', 'Terrace', 'Concierge Service', 'Premium Amenities']},
-    {'id': 'room-6', 'name': 'Classic Double', 'price': 199, 'maxGuests': 2, 'amenities': ['Double Bed', 'City View', 'Work Area', 'Free WiFi', 'Daily Housekeeping']},
-    {'id': 'room-7', 'name': 'Superior Twin', 'price': 249, 'maxGuests': 2, 'amenities': ['Twin Beds', 'Garden View', 'Seating Area', 'Mini Fridge', 'Free WiFi']},
-    {'id': 'room-8', 'name': 'Junior Suite', 'price': 349, 'maxGuests': 3, 'amenities': ['Queen Bed', 'Separate Lounge', 'Work Desk', 'Mini Bar', 'Free WiFi', 'Express Check-in']},
-    {'id': 'room-9', 'name': 'Family Room', 'price': 399, 'maxGuests': 5, 'amenities': ['King + Sofa Bed', 'Family Amenities', 'Kitchenette', 'Game Area', 'Free WiFi', 'Kids Welcome']},
-    {'id': 'room-10', 'name': 'Luxury Studio', 'price': 279, 'maxGuests': 2, 'amenities': ['Queen Bed', 'Studio Layout', 'Kitchenette', 'Work Space', 'Free WiFi', 'Modern Design']},
-    {'id': 'room-11', 'name': 'Romantic Suite', 'price': 459, 'maxGuests': 2, 'amenities': ['King Bed', 'Romantic Decor', 'Jacuzzi', 'Champagne Service', 'Free WiFi', 'Late Checkout']},
-    {'id': 'room-12', 'name': 'Business Suite', 'price': 379, 'maxGuests': 2, 'amenities': ['King Bed', 'Office Space', 'Meeting Area', 'Business Center Access', 'Premium WiFi', 'Express Services']},
-    {'id': 'room-13', 'name': 'Spa Retreat', 'price': 529, 'maxGuests': 2, 'amenities': ['King Bed', 'Spa Access', 'Wellness Amenities', 'Meditation Space', 'Free WiFi', 'Healthy Minibar']},
-    {'id': 'room-14', 'name': 'Artist Loft', 'price': 329, 'maxGuests': 3, 'amenities': ['Queen Bed', 'Creative Space', 'Art Supplies', 'Natural Light', 'Free WiFi', 'Inspiring Views']},
-    {'id': 'room-15', 'name': 'Royal Villa', 'price': 999, 'maxGuests': 8, 'amenities': ['Multiple Bedrooms', 'Private Pool', 'Full Kitchen', 'Butler Service', 'Premium WiFi', 'Exclusive Access']}
-]
-
-# Room descriptions
-descriptions = {
-    'room-2': 'Wake up to breathtaking ocean views in our Deluxe Ocean View room. This elegant space features a comfortable queen bed, private balcony, and direct access to our spa facilities.',
-    'room-3': 'Experience ultimate luxury in our Presidential Suite, featuring a separate living room, full kitchen, and butler service. Perfect for extended stays and special occasions.',
-    'room-4': 'Relax in our Garden Villa with its private patio overlooking lush gardens. This spacious accommodation includes a kitchenette and direct pool access.',
-    'room-5': 'Our crown jewel, the Penthouse Suite offers panoramic views, a full kitchen, and expansive terrace. Includes dedicated concierge service and premium amenities.',
-    'room-6': 'Our Classic Double room provides comfortable accommodation with modern amenities at an exceptional value. Perfect for business travelers and couples.',
-    'room-7': 'The Superior Twin room features two comfortable beds and garden views. Ideal for friends traveling together or business colleagues.',
-    'room-8': 'Enjoy extra space in our Junior Suite with a separate lounge area and express check-in service. Perfect for guests who value comfort and convenience.',
-    'room-9': 'Our Family Room is designed with families in mind, featuring a king bed plus sofa bed, game area, and family-friendly amenities throughout.',
-    'room-10': 'The Luxury Studio combines living and sleeping areas in a modern, efficient design. Features a kitchenette and dedicated work space.',
-    'room-11': 'Create unforgettable memories in our Romantic Suite, featuring romantic decor, in-room jacuzzi, and complimentary champagne service.',
-    'room-12': 'Designed for the business traveler, our Business Suite includes a dedicated office space, meeting area, and express business services.',
-    'room-13': 'Find your zen in our Spa Retreat room, featuring wellness amenities, meditation space, and direct spa access for the ultimate relaxation experience.',
-    'room-14': 'Unleash your creativity in our Artist Loft, featuring a dedicated creative space, art supplies, and inspiring views to fuel your imagination.',
-    'room-15': 'The ultimate in luxury, our Royal Villa features multiple bedrooms, private pool, and exclusive access to premium services and amenities.'
-}
-
-def generate_room_html(room):
-    guest_options = '\n'.join([f'                                    <option value="{i+1}">{i+1} Guest{"s" if i > 0 else ""}</option>' for i in range(room['maxGuests'])])
-    
-    amenity_list_1 = '\n'.join([f'''                                    <li class="amenity-item flex items-center">
-                                        <svg class="amenity-icon w-5 h-5 text-blue-600 mr-3" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"></path>
-                                        </svg>
-                                        <span>{amenity}</span>
-                                    </li>''' for amenity in room['amenities'][:3]])
-    
-    amenity_list_2 = '\n'.join([f'''                                    <li class="amenity-item flex items-center">
-                                        <svg class="amenity-icon w-5 h-5 text-blue-600 mr-3" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 13l4 4L19 7"></path>
-                                        </svg>
-                                        <span>{amenity}</span>
-                                    </li>''' for amenity in room['amenities'][3:]])
-
-    html_content = f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{room['name']} - Luxury Villa Retreat</title>
-    <meta name="description" content="Book our {room['name']} featuring {', '.join(room['amenities'][:3]).lower()}. Perfect for luxury travelers seeking comfort and elegance.">
-    <link rel="stylesheet" href="../css/main.css">
-    <link rel="stylesheet" href="../css/responsive.css">
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script src="https://js.stripe.com/v3/"></script>
-</head>
-<body>
-    <!-- Navigation -->
-    <nav class="bg-white shadow-lg fixed w-full top-0 z-50">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-            <div class="flex justify-between h-16">
-                <div class="flex items-center">
-                    <a href="../index.html" class="text-2xl font-bold text-gray-800">Luxury Villa Retreat</a>
-                </div>
-                <div class="hidden md:flex items-center space-x-8">
-                    <a href="../index.html" class="text-gray-700 hover:text-blue-600 font-medium">Home</a>
-                    <a href="../location.html" class="text-gray-700 hover:text-blue-600 font-medium">Location</a>
-                    <a href="../index.html#rooms" class="text-gray-700 hover:text-blue-600 font-medium">Rooms</a>
-                    <a href="../index.html#contact" class="text-gray-700 hover:text-blue-600 font-medium">Contact</a>
-                </div>
-                <div class="md:hidden flex items-center">
-                    <button id="mobile-menu-btn" class="text-gray-700 hover:text-blue-600">
-                        <svg class="w-6 h-6" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M4 6h16M4 12h16M4 18h16"></path>
-                        </svg>
-                    </button>
-                </div>
-            </div>
-        </div>
-        <!-- Mobile menu -->
-        <div id="mobile-menu" class="hidden md:hidden bg-white border-t">
-            <div class="px-2 pt-2 pb-3 space-y-1">
-                <a href="../index.html" class="block px-3 py-2 text-gray-700 hover:text-blue-600">Home</a>
-                <a href="../location.html" class="block px-3 py-2 text-gray-700 hover:text-blue-600">Location</a>
-                <a href="../index.html#rooms" class="block px-3 py-2 text-gray-700 hover:text-blue-600">Rooms</a>
-                <a href="../index.html#contact" class="block px-3 py-2 text-gray-700 hover:text-blue-600">Contact</a>
-            </div>
-        </div>
-    </nav>
-
-    <!-- Room Header -->
-    <section class="room-header bg-gradient-to-r from-gray-50 to-blue-50 pt-20">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8 py-16">
-            <div class="text-center">
-                <h1 class="text-4xl md:text-5xl font-bold text-gray-900 mb-4">{room['name']}</h1>
-                <p class="text-xl text-gray-600 mb-6">{descriptions[room['id']]}</p>
-                <div class="room-price text-3xl font-bold text-blue-600 mb-8">
-                    ${room['price']}<span class="text-lg font-normal text-gray-500">/night</span>
-                </div>
-                <div class="flex flex-col sm:flex-row gap-4 justify-center">
-                    <button onclick="scrollToBooking()" class="bg-blue-600 text-white px-8 py-3 rounded-lg font-semibold hover:bg-blue-700 transition duration-300">
-                        Book Now
-                    </button>
-                    <a href="../index.html#rooms" class="bg-white text-blue-600 px-8 py-3 rounded-lg font-semibold border-2 border-blue-600 hover:bg-blue-50 transition duration-300">
-                        View All Rooms
-                    </a>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <!-- Room Details -->
-    <section class="py-16 bg-white">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-            <div class="grid grid-cols-1 lg:grid-cols-3 gap-12">
-                <!-- Room Information -->
-                <div class="lg:col-span-2">
-                    <div class="mb-12">
-                        <h2 class="text-3xl font-bold text-gray-900 mb-6">Room Overview</h2>
-                        <p class="text-lg text-gray-600 mb-6">
-                            {descriptions[room['id']]} This thoughtfully designed space combines luxury with functionality to create the perfect retreat for discerning guests.
-                        </p>
-                        <p class="text-lg text-gray-600 mb-6">
-                            Every detail has been carefully considered to ensure your comfort and satisfaction. From premium furnishings to state-of-the-art amenities, this room provides everything you need for an exceptional stay.
-                        </p>
-                        <p class="text-lg text-gray-600">
-                            Whether you're traveling for business or leisure, our {room['name'].lower()} offers the perfect blend of comfort, style, and convenience to make your stay truly memorable.
-                        </p>
-                    </div>
-
-                    <!-- Room Amenities -->
-                    <div class="room-amenities mb-12">
-                        <h3 class="text-2xl font-bold text-gray-900 mb-6">Room Amenities</h3>
-                        <div class="grid grid-cols-1 md:grid-cols-2 gap-6">
-                            <div class="amenities-list">
-                                <ul class="space-y-3">
-{amenity_list_1}
-                                </ul>
-                            </div>
-                            <div class="amenities-list">
-                                <ul class="space-y-3">
-{amenity_list_2}
-                                </ul>
-                            </div>
-                        </div>
-                    </div>
-                </div>
-
-                <!-- Booking Sidebar -->
-                <div class="lg:col-span-1">
-                    <div class="booking-form bg-white p-6 rounded-lg shadow-lg border sticky top-24">
-                        <h3 class="text-2xl font-bold text-gray-900 mb-6">Book This Room</h3>
-                        
-                        <form id="room-booking-form" class="space-y-4">
-                            <div>
-                                <label for="checkin" class="block text-sm font-medium text-gray-700 mb-1">Check-in Date</label>
-                                <input type="date" id="checkin" name="checkin" required 
-                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500">
-                            </div>
-                            
-                            <div>
-                                <label for="checkout" class="block text-sm font-medium text-gray-700 mb-1">Check-out Date</label>
-                                <input type="date" id="checkout" name="checkout" required 
-                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500">
-                            </div>
-                            
-                            <div>
-                                <label for="guests" class="block text-sm font-medium text-gray-700 mb-1">Guests</label>
-                                <select id="guests" name="guests" required 
-                                        class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500">
-{guest_options}
-                                </select>
-                            </div>
-                            
-                            <div class="booking-summary bg-gray-50 p-4 rounded-md">
-                                <div class="flex justify-between items-center mb-2">
-                                    <span class="text-sm text-gray-600">Room Rate:</span>
-                                    <span class="text-sm font-medium">${room['price']}/night</span>
-                                </div>
-                                <div class="flex justify-between items-center mb-2">
-                                    <span class="text-sm text-gray-600">Nights:</span>
-                                    <span class="text-sm font-medium" id="nights-display">0</span>
-                                </div>
-                                <div class="border-t pt-2">
-                                    <div class="flex justify-between items-center">
-                                        <span class="font-medium">Total:</span>
-                                        <span class="text-xl font-bold text-blue-600" id="total-price">$0</span>
-                                    </div>
-                                </div>
-                            </div>
-                            
-                            <h4 class="text-lg font-semibold text-gray-900 mt-6 mb-4">Guest Information</h4>
-                            
-                            <div class="grid grid-cols-2 gap-4">
-                                <div>
-                                    <label for="firstName" class="block text-sm font-medium text-gray-700 mb-1">First Name</label>
-                                    <input type="text" id="firstName" name="firstName" required 
-                                           class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500">
-                                </div>
-                                <div>
-                                    <label for="lastName" class="block text-sm font-medium text-gray-700 mb-1">Last Name</label>
-                                    <input type="text" id="lastName" name="lastName" required 
-                                           class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500">
-                                </div>
-                            </div>
-                            
-                            <div>
-                                <label for="email" class="block text-sm font-medium text-gray-700 mb-1">Email Address</label>
-                                <input type="email" id="email" name="email" required 
-                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500">
-                            </div>
-                            
-                            <div>
-                                <label for="phone" class="block text-sm font-medium text-gray-700 mb-1">Phone Number</label>
-                                <input type="tel" id="phone" name="phone" required 
-                                       class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500">
-                            </div>
-                            
-                            <div>
-                                <label for="special-requests" class="block text-sm font-medium text-gray-700 mb-1">Special Requests (Optional)</label>
-                                <textarea id="special-requests" name="special-requests" rows="3" 
-                                          class="w-full px-3 py-2 border border-gray-300 rounded-md focus:ring-blue-500 focus:border-blue-500"
-                                          placeholder="Any special requests or preferences..."></textarea>
-                            </div>
-                            
-                            <button type="submit" class="w-full bg-blue-600 text-white py-3 px-4 rounded-md font-semibold hover:bg-blue-700 transition duration-300">
-                                Complete Booking
-                            </button>
-                        </form>
-                        
-                        <div class="mt-4 text-center">
-                            <p class="text-xs text-gray-500">
-                                Secure payment processing with SSL encryption
-                            </p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <!-- Room Policies -->
-    <section class="py-16 bg-gray-50">
-        <div class="max-w-4xl mx-auto px-4 sm:px-6 lg:px-8">
-            <h2 class="text-3xl font-bold text-gray-900 mb-8 text-center">Room Policies</h2>
-            
-            <div class="grid grid-cols-1 md:grid-cols-2 gap-8">
-                <div class="bg-white p-6 rounded-lg shadow">
-                    <h3 class="text-xl font-semibold text-gray-900 mb-4">Check-in & Check-out</h3>
-                    <ul class="space-y-2 text-gray-600">
-                        <li>• Check-in: 3:00 PM</li>
-                        <li>• Check-out: 11:00 AM</li>
-                        <li>• Early check-in available upon request</li>
-                        <li>• Late check-out available for additional fee</li>
-                    </ul>
-                </div>
-                
-                <div class="bg-white p-6 rounded-lg shadow">
-                    <h3 class="text-xl font-semibold text-gray-900 mb-4">Cancellation Policy</h3>
-                    <ul class="space-y-2 text-gray-600">
-                        <li>• Free cancellation up to 24 hours before check-in</li>
-                        <li>• 50% charge for cancellations within 24 hours</li>
-                        <li>• No-show bookings are charged in full</li>
-                        <li>• Modifications subject to availability</li>
-                    </ul>
-                </div>
-                
-                <div class="bg-white p-6 rounded-lg shadow">
-                    <h3 class="text-xl font-semibold text-gray-900 mb-4">Room Rules</h3>
-                    <ul class="space-y-2 text-gray-600">
-                        <li>• Maximum occupancy: {room['maxGuests']} guests</li>
-                        <li>• No smoking in rooms</li>
-                        <li>• Pets allowed with prior approval</li>
-                        <li>• Quiet hours: 10:00 PM - 7:00 AM</li>
-                    </ul>
-                </div>
-                
-                <div class="bg-white p-6 rounded-lg shadow">
-                    <h3 class="text-xl font-semibold text-gray-900 mb-4">Additional Services</h3>
-                    <ul class="space-y-2 text-gray-600">
-                        <li>• 24/7 room service available</li>
-                        <li>• Daily housekeeping included</li>
-                        <li>• Laundry and dry cleaning services</li>
-                        <li>• Concierge assistance</li>
-                    </ul>
-                </div>
-            </div>
-        </div>
-    </section>
-
-    <!-- Footer -->
-    <footer class="bg-gray-900 text-white py-12">
-        <div class="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
-            <div class="grid grid-cols-1 md:grid-cols-3 gap-8">
-                <div>
-                    <h3 class="text-xl font-semibold mb-4">Luxury Villa Retreat</h3>
-                    <p class="text-gray-400">Experience the finest in luxury accommodation with our 15 unique rooms.</p>
-                </div>
-                <div>
-                    <h3 class="text-xl font-semibold mb-4">Quick Links</h3>
-                    <ul class="space-y-2">
-                        <li><a href="../index.html" class="text-gray-400 hover:text-white">Home</a></li>
-                        <li><a href="../location.html" class="text-gray-400 hover:text-white">Location</a></li>
-                        <li><a href="../index.html#rooms" class="text-gray-400 hover:text-white">Rooms</a></li>
-                        <li><a href="../index.html#contact" class="text-gray-400 hover:text-white">Contact</a></li>
-                    </ul>
-                </div>
-                <div>
-                    <h3 class="text-xl font-semibold mb-4">Contact Info</h3>
-                    <ul class="space-y-2 text-gray-400">
-                        <li>Phone: +1 (555) 123-4567</li>
-                        <li>Email: info@luxuryvillaretreat.com</li>
-                        <li>24/7 Concierge Service</li>
-                    </ul>
-                </div>
-            </div>
-            <div class="border-t border-gray-800 mt-8 pt-8 text-center">
-                <p class="text-gray-400">&copy; 2024 Luxury Villa Retreat. All rights reserved.</p>
-            </div>
-        </div>
-    </footer>
-
-    <script src="../js/navigation.js"></script>
-    <script src="../js/booking.js"></script>
-    <script src="../js/payment.js"></script>
-    
-    <script>
-        function scrollToBooking() {{
-            document.querySelector('.booking-form').scrollIntoView({{ 
-                behavior: 'smooth',
-                block: 'start'
-            }});
-        }}
-    </script>
-</body>
-</html>'''
-    
-    return html_content
-
-# Generate all room files
-for room in rooms:
-    html_content = generate_room_html(room)
-    filename = f"./rooms/{room['id']}.html"
-    
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"Generated {filename}")
-
-print("All room pages generated successfully!")
+import build_critical
+from build_calendar import load_availability, write_calendar
+from build_assets import ASSETS, build_assets, minify_html_fragment
+from build_images import available_formats, build_images
+from build_output import SIBLING_SUFFIXES, OutputWriter, file_sha256, siblings_current
+from build_search import write_search_index
+from build_utilities import build_stylesheet
+from templating import TemplateLoader
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOMS_DIR = os.path.join(BASE_DIR, 'rooms')
+
+# Input/output hashes of every generated page, used for incremental rebuilds
+MANIFEST_PATH = os.path.join(BASE_DIR, '.build-manifest.json')
+MANIFEST_VERSION = 1
+
+# Single source of truth for rooms; booking.js reads the files emitted into DATA_DIR
+CATALOG_PATH = os.path.join(BASE_DIR, 'data', 'catalog.json')
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+# Sharded filter index read by js/room-search.js
+SEARCH_DIR = os.path.join(DATA_DIR, 'search')
+# Availability and nightly rates exported from the PMS (CSV or SQLite), and
+# the per-room, per-month calendar shards booking.js reads
+AVAILABILITY_PATH = os.path.join(DATA_DIR, 'availability.csv')
+CALENDAR_DIR = os.path.join(DATA_DIR, 'calendar')
+
+# Page templates are compiled once per process; the compiled form is cached
+# under .build-cache/ keyed by the template source hash
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATE_CACHE_DIR = os.path.join(BASE_DIR, '.build-cache', 'templates')
+PAGE_TEMPLATES = ('room.html', 'partials/guest_option.html', 'partials/amenity_item.html',
+                  'partials/room_image.html', 'partials/picture_source.html',
+                  'partials/stylesheet.html', 'partials/stylesheet_deferred.html')
+
+# Optimized room pages inline the CSS used by the markup above this comment
+# in room.html (plus the header image) and load the full stylesheet async
+CRITICAL_CSS_MARKER = '<!-- critical-css:end'
+ABOVE_THE_FOLD_PARTIALS = ('partials/room_image.html',)
+
+templates = TemplateLoader(TEMPLATES_DIR, cache_dir=TEMPLATE_CACHE_DIR)
+# Optimized builds minify the template markup once, when it is compiled, so
+# pages can be streamed straight to disk without a whole-page minify pass
+minified_templates = TemplateLoader(
+    TEMPLATES_DIR, cache_dir=TEMPLATE_CACHE_DIR, literal_filter=minify_html_fragment,
+    filter_key=hashlib.sha256(
+        inspect.getsource(inspect.getmodule(minify_html_fragment)).encode('utf-8')).hexdigest())
+
+# Resized room photos; the sizes attributes match the layouts in
+# partials/room_image.html (max-w-5xl) and the card grid of rooms/index.html
+IMAGE_CACHE_DIR = os.path.join(BASE_DIR, '.build-cache', 'images')
+ROOM_IMAGE_SIZES = '(min-width: 1024px) 1024px, 100vw'
+CARD_IMAGE_SIZES = '(min-width: 1280px) 400px, (min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw'
+
+# Listing of every catalog room, rendered from templates/rooms.html
+LISTING_PATH = os.path.join(ROOMS_DIR, 'index.html')
+
+# Fields of each catalog room that the browser needs (booking.js)
+PUBLIC_ROOM_FIELDS = ('id', 'name', 'price', 'maxGuests', 'amenities')
+
+
+def load_catalog(path=CATALOG_PATH):
+    with open(path, encoding='utf-8') as f:
+        catalog = json.load(f)
+    seen = set()
+    for room in catalog['rooms']:
+        missing = [k for k in PUBLIC_ROOM_FIELDS + ('description',) if k not in room]
+        if missing:
+            raise ValueError(f"{path}: room {room.get('id', '?')} is missing {', '.join(missing)}")
+        if room['id'] in seen:
+            raise ValueError(f"{path}: duplicate room id {room['id']}")
+        seen.add(room['id'])
+    return catalog
+
+# Per-room fragments repeat heavily across a catalog (a few dozen distinct
+# amenities, a handful of occupancies), so each is rendered once per process
+def _templates(optimize):
+    return minified_templates if optimize else templates
+
+
+def _render_fragment(name, context, optimize):
+    html = _templates(optimize).get(name).render(context)
+    # A minified fragment keeps its indentation as one space; drop it
+    return html.strip() if optimize else html
+
+
+@functools.lru_cache(maxsize=None)
+def _amenity_item_html(amenity, optimize=False):
+    return _render_fragment('partials/amenity_item.html', {'amenity': amenity}, optimize)
+
+
+@functools.lru_cache(maxsize=None)
+def _guest_options_html(max_guests, optimize=False):
+    return '\n'.join([
+        _render_fragment('partials/guest_option.html',
+                         {'count': i + 1, 'label': f'{i+1} Guest{"s" if i > 0 else ""}'}, optimize)
+        for i in range(max_guests)
+    ])
+
+
+def _above_the_fold_html():
+    literal = ''.join(c for c in templates.get('room.html').chunks if isinstance(c, str))
+    fold = literal.split(CRITICAL_CSS_MARKER, 1)[0]
+    partials = [''.join(c for c in templates.get(name).chunks if isinstance(c, str))
+                for name in ABOVE_THE_FOLD_PARTIALS]
+    return '\n'.join([fold] + partials)
+
+
+# Minified stylesheets of this build by fingerprinted path. A dry run never
+# writes them, so pages read them from here rather than from disk
+_stylesheets = {}
+
+
+def _init_worker(stylesheets, template_cache_dir):
+    _stylesheets.update(stylesheets)
+    templates.cache_dir = minified_templates.cache_dir = template_cache_dir
+
+
+@functools.lru_cache(maxsize=None)
+def _critical_css(site_css):
+    # site_css is a fingerprinted path, so caching on it is safe across builds
+    css = _stylesheets.get(site_css)
+    if css is None:
+        with open(os.path.join(BASE_DIR, site_css), encoding='utf-8') as f:
+            css = f.read()
+    return build_critical.critical_css(css, _above_the_fold_html())
+
+
+@functools.lru_cache(maxsize=None)
+def _stylesheet_html(site_css, optimize=False):
+    if not optimize:
+        return _render_fragment('partials/stylesheet.html', {'site_css': site_css}, False)
+    return _render_fragment('partials/stylesheet_deferred.html', {
+        'site_css': site_css,
+        'critical_css': _critical_css(site_css),
+    }, True)
+
+
+def picture_html(name, picture, alt, sizes, prefix='', optimize=False):
+    """Render a <picture> partial for one of build_images' pictures.
+
+    prefix is prepended to every URL ('../' from rooms/).
+    """
+    def srcset(value):
+        return ', '.join(prefix + entry for entry in value.split(', '))
+
+    sources = '\n'.join([
+        _render_fragment('partials/picture_source.html',
+                         {'type': mime, 'srcset': srcset(value), 'sizes': sizes}, optimize)
+        for mime, value in picture['sources']
+    ])
+    return _render_fragment(name, {
+        'sources': sources,
+        'src': prefix + picture['src'],
+        'srcset': srcset(picture['srcset']),
+        'sizes': sizes,
+        'width': picture['width'],
+        'height': picture['height'],
+        'alt': alt,
+    }, optimize)
+
+
+def attach_pictures(room_list, pictures):
+    """Copy each room's rendered-image data onto it, for the page builders."""
+    return [dict(room, picture=pictures[room['image']]) if room.get('image') else room
+            for room in room_list]
+
+
+def asset_slots(assets):
+    """Template slots for the shared assets: 'js/room-search.js' -> room_search_js."""
+    return {os.path.basename(path).replace('.', '_').replace('-', '_'): url
+            for path, url in assets.items()}
+
+
+# Build options used when the asset stage is off: original files, unminified pages
+PLAIN_OPTIONS = {'assets': {path: path for path in ASSETS}, 'optimize': False}
+
+
+def room_context(room, options):
+    amenity_list = room['amenities']
+    optimize = options['optimize']
+    return {
+        **asset_slots(options['assets']),
+        'stylesheet': _stylesheet_html(options['assets']['css/site.css'], optimize),
+        'name': room['name'],
+        'name_lower': room['name'].lower(),
+        'description': room['description'],
+        'price': room['price'],
+        'max_guests': room['maxGuests'],
+        'meta_amenities': ', '.join(amenity_list[:3]).lower(),
+        'amenities_1': '\n'.join([_amenity_item_html(a, optimize) for a in amenity_list[:3]]),
+        'amenities_2': '\n'.join([_amenity_item_html(a, optimize) for a in amenity_list[3:]]),
+        'guest_options': _guest_options_html(room['maxGuests'], optimize),
+        'image': picture_html('partials/room_image.html', room['picture'], room['name'],
+                              ROOM_IMAGE_SIZES, prefix='../', optimize=optimize)
+                 if room.get('picture') else '',
+    }
+
+
+def generate_room_html(room, options=PLAIN_OPTIONS):
+    return _templates(options['optimize']).get('room.html').render(room_context(room, options))
+
+
+def render_room_chunks(room, options=PLAIN_OPTIONS):
+    """The page as a sequence of str pieces, for streaming to disk."""
+    return _templates(options['optimize']).get('room.html').render_chunks(room_context(room, options))
+
+
+def _sha256(data):
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+@functools.lru_cache(maxsize=None)
+def template_version(optimize=False):
+    """Hash of everything that shapes a page besides the room itself."""
+    digests = [_templates(optimize).get(name).digest for name in PAGE_TEMPLATES]
+    digests.append(_sha256(ROOM_IMAGE_SIZES))
+    code = [inspect.getsource(f)
+            for f in (_render_fragment, _guest_options_html, picture_html, _above_the_fold_html,
+                      _critical_css, _stylesheet_html, room_context, build_critical)]
+    return _sha256('\0'.join(code + digests))
+
+
+def clear_template_caches():
+    """Drop everything compiled or rendered from templates/ in this process."""
+    templates.clear()
+    minified_templates.clear()
+    for cached in (template_version, _critical_css, _stylesheet_html,
+                   _amenity_item_html, _guest_options_html):
+        cached.cache_clear()
+
+
+def room_input_hash(room, options):
+    payload = {
+        'room': room,
+        'options': options,
+        'template': template_version(options['optimize']),
+    }
+    return _sha256(json.dumps(payload, sort_keys=True))
+
+
+def load_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {'version': MANIFEST_VERSION, 'pages': {}}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'pages': {}}
+    return manifest
+
+
+def save_manifest(manifest, path=MANIFEST_PATH):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def _live_hash(path, optimize):
+    # None if an optimized page lost a sibling or has a stale one, so it is rewritten
+    if optimize and not siblings_current(path):
+        return None
+    return file_sha256(path)
+
+
+def build_room(room, entry, out_dir=ROOMS_DIR, options=PLAIN_OPTIONS, force=False,
+               dry_run=False, measure=False):
+    """Render one room page if its inputs changed.
+
+    Returns (status, manifest_entry) where status is 'skipped' (inputs
+    unchanged), 'unchanged' (re-rendered to identical bytes) or 'written'.
+    With options['optimize'] the page is minified and gets .gz/.br siblings.
+    The page is streamed to disk and swapped in atomically; with dry_run
+    it is only hashed. With measure, an optimized page's entry also gets
+    the sizes for the transfer report, which costs a second, plain render.
+    """
+    filename = os.path.join(out_dir, f"{room['id']}.html")
+    input_hash = room_input_hash(room, options)
+    optimize = options['optimize']
+
+    on_disk = _live_hash(filename, optimize)
+    if (not force and entry and entry.get('input') == input_hash
+            and on_disk is not None and on_disk == entry.get('output')
+            and not (measure and optimize and 'sizes' not in entry)):
+        return 'skipped', entry
+
+    writer = OutputWriter(dry_run=dry_run)
+    result = writer.stream(filename, render_room_chunks(room, options),
+                           compress=optimize, unchanged_hash=on_disk)
+    new_entry = {'input': input_hash, 'output': result.sha256}
+    if optimize and measure:
+        # Size of the unminified page for the transfer report, without joining it
+        raw_size = sum(len(chunk.encode('utf-8')) for chunk in render_room_chunks(room))
+        new_entry['sizes'] = [raw_size, result.size, min(result.compressed_sizes.values())]
+    if not optimize:
+        # Don't leave precompressed copies of an older build next to the page
+        for suffix in SIBLING_SUFFIXES:
+            writer.remove(filename + suffix)
+    return ('written' if result.written else 'unchanged'), new_entry
+
+
+def _build_room_job(job):
+    # Worker entry point: never raise, so one bad room can't sink the batch
+    room, entry, out_dir, options, force, dry_run, measure = job
+    try:
+        return build_room(room, entry, out_dir=out_dir, options=options, force=force,
+                          dry_run=dry_run, measure=measure)
+    except Exception as exc:
+        return 'error', f'{type(exc).__name__}: {exc}'
+
+
+def build_all(room_list, out_dir=ROOMS_DIR, manifest_path=MANIFEST_PATH,
+              options=PLAIN_OPTIONS, jobs=1, force=False, verbose=True, dry_run=False,
+              prune=True, measure=False):
+    """Build every room page, optionally across a pool of worker processes.
+
+    Results are gathered in catalog order, so the manifest and the log are
+    identical whatever the pool size. Returns (counts, errors, pages) where
+    errors is a list of (room id, message) pairs and pages is the new
+    manifest section. A dry run leaves the pages and the manifest untouched.
+    With prune, the pages of rooms missing from room_list are deleted;
+    with prune=False, room_list may be a subset of the catalog and the
+    manifest keeps the entries of the other rooms.
+    """
+    manifest = load_manifest(manifest_path)
+    old_pages = manifest['pages']
+    pages = {} if prune else dict(old_pages)
+    counts = {'written': 0, 'unchanged': 0, 'skipped': 0, 'error': 0}
+    errors = []
+
+    work = []
+    for room in room_list:
+        key = f"rooms/{room['id']}.html"
+        work.append((room, old_pages.get(key), out_dir, options, force, dry_run, measure))
+
+    if jobs > 1 and len(work) > 1:
+        chunksize = max(1, len(work) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(dict(_stylesheets), templates.cache_dir)) as pool:
+            results = list(pool.map(_build_room_job, work, chunksize=chunksize))
+    else:
+        results = [_build_room_job(job) for job in work]
+
+    for room, (status, result) in zip(room_list, results):
+        key = f"rooms/{room['id']}.html"
+        counts[status] += 1
+        if status == 'error':
+            errors.append((room['id'], result))
+            # Forget the page so the next run retries it
+            pages.pop(key, None)
+            continue
+        pages[key] = result
+        if status == 'written' and verbose:
+            print(f"Generated {key}")
+
+    if prune:
+        # Rooms that left the catalog take their pages with them
+        writer = OutputWriter(dry_run=dry_run)
+        built = {f"rooms/{room['id']}.html" for room in room_list}
+        for key in sorted(set(old_pages) - built):
+            filename = os.path.join(out_dir, os.path.basename(key))
+            for suffix in ('',) + SIBLING_SUFFIXES:
+                writer.remove(filename + suffix)
+            if verbose:
+                print(f"Removed {key}")
+
+    manifest['pages'] = pages
+    if not dry_run:
+        save_manifest(manifest, manifest_path)
+    return counts, errors, pages
+
+
+def _compact_json(obj):
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def write_room_data(room_list, data_dir=DATA_DIR, verbose=True, write=None, only_ids=None,
+                    prune=True):
+    """Emit the browser copy of the catalog.
+
+    data/rooms.json holds every room for listings; data/rooms/<id>.json
+    holds a single room so a room page only downloads its own entry.
+    write(path, bytes) defaults to a fresh OutputWriter; only_ids limits
+    the per-room files to those rooms. With prune, the files of rooms no
+    longer in room_list are removed.
+    """
+    write = write or OutputWriter()
+    public = [{k: room[k] for k in PUBLIC_ROOM_FIELDS} for room in room_list]
+    outputs = {os.path.join(data_dir, 'rooms.json'): _compact_json(public)}
+    for room in public:
+        if only_ids is not None and room['id'] not in only_ids:
+            continue
+        outputs[os.path.join(data_dir, 'rooms', f"{room['id']}.json")] = _compact_json(room)
+
+    written = 0
+    for path, data in outputs.items():
+        if write(path, data):
+            written += 1
+            if verbose:
+                print(f"Generated {os.path.relpath(path, BASE_DIR)}")
+
+    rooms_dir = os.path.join(data_dir, 'rooms')
+    if prune and os.path.isdir(rooms_dir):
+        # Rooms leave the catalog
+        expected = {f"{room['id']}.json" for room in public}
+        for entry in os.listdir(rooms_dir):
+            if entry not in expected:
+                os.remove(os.path.join(rooms_dir, entry))
+    return written
+
+
+def write_calendar_shards(room_list, path=AVAILABILITY_PATH, write=None, force=False,
+                          dry_run=False, manifest_path=MANIFEST_PATH, log=sys.stdout):
+    """Emit the calendar shards for a PMS export, skipping the unchanged ones.
+
+    The input hash of every shard is kept in the build manifest. Does
+    nothing when there is no export at path.
+    """
+    if not os.path.exists(path):
+        return 0
+    write = write or OutputWriter(dry_run=dry_run)
+    manifest = load_manifest(manifest_path)
+    state = manifest.setdefault('calendar', {})
+    encoded, ignored = write_calendar(room_list, load_availability(path), CALENDAR_DIR, write,
+                                      state, force=force, prune=not dry_run)
+    if not dry_run:
+        save_manifest(manifest, manifest_path)
+    if encoded:
+        print(f"Encoded {encoded} calendar shard(s)", file=log)
+    if ignored:
+        print(f"Ignored {ignored} availability row(s) for rooms not in the catalog", file=log)
+    return encoded
+
+
+def render_room_grid(room_list, optimize=False):
+    """One card per catalog room, for the listing page."""
+    cards = []
+    for room in room_list:
+        features = [_render_fragment('partials/room_card_feature.html', {'amenity': a}, optimize)
+                    for a in room['amenities'][:4]]
+        cards.append(_render_fragment('partials/room_card.html', {
+            'id': room['id'],
+            'name': room['name'],
+            'name_lower': room['name'].lower(),
+            'price': room['price'],
+            'features': '\n'.join(features),
+            'image': picture_html('partials/room_card_image.html', room['picture'], room['name'],
+                                  CARD_IMAGE_SIZES, prefix='../', optimize=optimize)
+                     if room.get('picture') else '',
+        }, optimize))
+    return '\n'.join(cards)
+
+
+def write_room_listing(room_list, options=PLAIN_OPTIONS, path=LISTING_PATH, verbose=True,
+                       write=None):
+    """Render rooms/index.html, the grid of every catalog room."""
+    write = write or OutputWriter()
+    optimize = options['optimize']
+    context = {
+        **asset_slots(options['assets']),
+        'stylesheet': _render_fragment('partials/stylesheet.html',
+                                       {'site_css': options['assets']['css/site.css']}, optimize),
+        'cards': render_room_grid(room_list, optimize),
+    }
+    chunks = _templates(optimize).get('rooms.html').render_chunks(context)
+    result = write.stream(path, chunks, compress=optimize,
+                          unchanged_hash=_live_hash(path, optimize))
+    if not optimize:
+        for suffix in SIBLING_SUFFIXES:
+            write.remove(path + suffix)
+    if result.written and verbose:
+        print(f"Generated {os.path.relpath(path, BASE_DIR)}")
+    return result.written
+
+
+def _kb(size):
+    return f'{size / 1024:.1f} KB'
+
+
+def print_transfer_report(pages, asset_sizes, per_page=False):
+    """Compare bytes transferred for a cold page view before and after the asset stage.
+
+    Before: unminified HTML plus the original CSS/JS, uncompressed.
+    After: minified HTML plus fingerprinted CSS/JS, precompressed.
+    """
+    assets_before = sum(original for original, _, _ in asset_sizes.values())
+    assets_after = sum(compressed for _, _, compressed in asset_sizes.values())
+    total_before = total_after = 0
+    for key, entry in pages.items():
+        raw, _, compressed = entry['sizes']
+        before, after = raw + assets_before, compressed + assets_after
+        total_before += before
+        total_after += after
+        if per_page:
+            print(f"  {key}: {_kb(before)} -> {_kb(after)} ({1 - after / before:.0%} saved)")
+    count = len(pages)
+    print(f"Transfer per page: {_kb(total_before / count)} -> {_kb(total_after / count)} "
+          f"({1 - total_after / total_before:.0%} saved)")
+
+
+def build_asset_options(writer, no_assets=False, log=sys.stdout):
+    """Build the stylesheet and, unless no_assets, the fingerprinted assets.
+
+    Returns the page render options and the asset sizes for the transfer
+    report (None without assets). The generated stylesheet is passed along
+    in memory, so a dry run works on a clean checkout.
+    """
+    site_css, unstyled = build_stylesheet(BASE_DIR, writer)
+    if unstyled:
+        print(f"No utility or stylesheet rule for: {' '.join(unstyled)}", file=log)
+    if no_assets:
+        return PLAIN_OPTIONS, None
+
+    asset_urls, minified, asset_sizes = build_assets(
+        BASE_DIR, writer, prune=not writer.dry_run, contents={'css/site.css': site_css})
+    _stylesheets[asset_urls['css/site.css']] = minified['css/site.css']
+    return {'assets': asset_urls, 'optimize': True}, asset_sizes
+
+
+def build_site(catalog, writer, jobs=1, force=False, no_assets=False, log=sys.stdout,
+               options=None, only_rooms=None, availability=AVAILABILITY_PATH, measure=False):
+    """Run every build stage for a loaded catalog.
+
+    Returns (counts, errors, pages, options, asset_sizes). Passing the
+    options of an earlier build skips the stylesheet and asset stages, and
+    only_rooms limits the room pages and per-room data to those ids; the
+    dev server uses both to rebuild a catalog edit quickly. With measure,
+    the pages record their sizes for the transfer report.
+    """
+    verbose = not writer.dry_run
+    prune = not writer.dry_run and only_rooms is None
+    write_room_data(catalog['rooms'], verbose=verbose, write=writer, only_ids=only_rooms,
+                    prune=not writer.dry_run)
+    write_search_index(catalog['rooms'], SEARCH_DIR, writer, prune=not writer.dry_run)
+    # A dry run encodes every shard so the hash list covers them all
+    write_calendar_shards(catalog['rooms'], availability, writer, force=force or writer.dry_run,
+                          dry_run=writer.dry_run, log=log)
+
+    image_sources = [room['image'] for room in catalog['rooms'] if room.get('image')]
+    pictures, encoded = build_images(BASE_DIR, image_sources, IMAGE_CACHE_DIR, writer,
+                                     jobs=jobs, prune=not writer.dry_run)
+    if image_sources and not available_formats():
+        print(f"Pillow is not installed; linking {len(pictures)} image(s) without resizing",
+              file=log)
+    elif encoded:
+        print(f"Encoded {encoded} image variant(s)", file=log)
+    room_list = attach_pictures(catalog['rooms'], pictures)
+
+    asset_sizes = None
+    if options is None:
+        options, asset_sizes = build_asset_options(writer, no_assets, log)
+    write_room_listing(room_list, options, verbose=verbose, write=writer)
+
+    if only_rooms is not None:
+        room_list = [room for room in room_list if room['id'] in only_rooms]
+    counts, errors, pages = build_all(room_list, options=options, jobs=jobs, force=force,
+                                      verbose=verbose, dry_run=writer.dry_run, prune=prune,
+                                      measure=measure)
+    return counts, errors, pages, options, asset_sizes
+
+
+# Generator inputs watched by --watch, relative to BASE_DIR: (path, recursive)
+WATCH_ROOTS = (('.', False), ('templates', True), ('css', False), ('js', False), ('data', False))
+
+
+def _is_source(path):
+    rel = os.path.relpath(path, BASE_DIR).replace(os.sep, '/')
+    name = os.path.basename(rel)
+    if rel.startswith(('rooms/', 'data/rooms/', 'data/search/')) or name.startswith('.'):
+        return False
+    if rel in ('css/site.css', 'data/rooms.json') or name.endswith(('.gz', '.br', '.tmp')):
+        return False
+    # Fingerprinted copies written by the asset stage: name.<10 hex>.ext
+    parts = name.split('.')
+    if len(parts) >= 3 and len(parts[-2]) == 10 and all(c in '0123456789abcdef' for c in parts[-2]):
+        return False
+    return rel.startswith('templates/') or name.endswith(
+        ('.py', '.html', '.css', '.js', '.json', '.csv', '.sqlite', '.db'))
+
+
+def watch(args, catalog, options, jobs, hashes):
+    """Serve the site and rebuild whenever one of its sources changes (--watch)."""
+    import dev_server
+
+    state = {'catalog': catalog, 'options': options, 'hashes': hashes}
+    data_paths = {os.path.abspath(args.catalog), os.path.abspath(args.availability)}
+
+    def rebuild(paths):
+        # Ignore events for files the last build wrote itself
+        paths = [p for p in paths if file_sha256(p) != state['hashes'].get(p)]
+        if not paths:
+            return None
+        if any(p.endswith('.py') for p in paths):
+            print("Generator code changed; restarting")
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+        if any(p.startswith(TEMPLATES_DIR + os.sep) for p in paths):
+            # Compiled templates and rendered fragments are cached for the process
+            clear_template_caches()
+
+        try:
+            new_catalog = load_catalog(args.catalog)
+        except (ValueError, KeyError) as exc:
+            print(f"Catalog error: {exc}", file=sys.stderr)
+            return []
+
+        options = only_rooms = None
+        old_rooms = state['catalog']['rooms']
+        new_rooms = new_catalog['rooms']
+        if data_paths.issuperset(paths) and [r['id'] for r in old_rooms] == [r['id'] for r in new_rooms]:
+            # Only these rooms' pages can change; stylesheet and assets are as they were
+            only_rooms = {new['id'] for old, new in zip(old_rooms, new_rooms) if old != new}
+            options = state['options']
+
+        before = load_manifest()['pages']
+        writer = OutputWriter()
+        try:
+            counts, errors, pages, options, _ = build_site(
+                new_catalog, writer, jobs=jobs, no_assets=args.no_assets,
+                options=options, only_rooms=only_rooms, availability=args.availability)
+        except ValueError as exc:
+            print(f"Build error: {exc}", file=sys.stderr)
+            return []
+        for room_id, message in errors:
+            print(f"Failed {room_id}: {message}", file=sys.stderr)
+        state.update(catalog=new_catalog, options=options, hashes=writer.hashes)
+
+        changed = {os.path.relpath(p, BASE_DIR).replace(os.sep, '/') for p in writer.written}
+        changed.update(key for key, entry in pages.items()
+                       if before.get(key, {}).get('output') != entry['output'])
+        # Hand-written pages, stylesheets and scripts are served as they are
+        for path in paths:
+            rel = os.path.relpath(path, BASE_DIR).replace(os.sep, '/')
+            if not rel.startswith(('templates/', 'data/')):
+                changed.add(rel)
+        return changed
+
+    roots = [(os.path.normpath(os.path.join(BASE_DIR, root)), recursive)
+             for root, recursive in WATCH_ROOTS]
+    dev_server.serve(BASE_DIR, rebuild, roots, _is_source, host=args.host, port=args.port)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate the static room pages.')
+    parser.add_argument('--force', action='store_true',
+                        help='re-render every page, ignoring the build manifest')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='number of worker processes (0 = one per CPU)')
+    parser.add_argument('--catalog', default=CATALOG_PATH,
+                        help='room catalog to build from (default: data/catalog.json)')
+    parser.add_argument('--availability', default=AVAILABILITY_PATH,
+                        help='PMS availability/rate export, CSV or SQLite '
+                             '(default: data/availability.csv)')
+    parser.add_argument('--no-assets', action='store_true',
+                        help='link the original CSS/JS and skip minification and precompression')
+    parser.add_argument('--report', action='store_true',
+                        help='measure and print the transfer size of every page')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='write nothing; print the sha256 of every output in '
+                             'sha256sum format for diffing builds')
+    parser.add_argument('--watch', action='store_true',
+                        help='after building, serve the site with live reload and '
+                             'rebuild whenever a source changes')
+    parser.add_argument('--host', default='127.0.0.1', help='--watch server address')
+    parser.add_argument('--port', type=int, default=8000, help='--watch server port')
+    args = parser.parse_args(argv)
+    if args.watch and args.dry_run:
+        parser.error('--watch and --dry-run cannot be combined')
+
+    catalog = load_catalog(args.catalog)
+    jobs = args.jobs or os.cpu_count() or 1
+    if args.dry_run:
+        # Not even the compiled templates are cached
+        templates.cache_dir = minified_templates.cache_dir = None
+    writer = OutputWriter(dry_run=args.dry_run)
+    # Keep stdout to the hash list on a dry run so it can be diffed as is
+    log = sys.stderr if args.dry_run else sys.stdout
+    counts, errors, pages, options, asset_sizes = build_site(
+        catalog, writer, jobs=jobs, force=args.force, no_assets=args.no_assets, log=log,
+        availability=args.availability, measure=args.report)
+
+    if args.dry_run:
+        hashes = {os.path.relpath(path, BASE_DIR): digest
+                  for path, digest in writer.hashes.items()}
+        hashes.update((key, entry['output']) for key, entry in pages.items())
+        for path in sorted(hashes):
+            print(f'{hashes[path]}  {path}')
+    print(f"{counts['written']} {'to write' if args.dry_run else 'written'}, "
+          f"{counts['unchanged']} unchanged, {counts['skipped']} up to date", file=log)
+    if args.report and asset_sizes and pages and not args.dry_run:
+        print_transfer_report(pages, asset_sizes, per_page=True)
+
+    if errors:
+        for room_id, message in errors:
+            print(f"Failed {room_id}: {message}", file=sys.stderr)
+        print(f"{len(errors)} room page(s) failed", file=sys.stderr)
+    if args.watch:
+        return watch(args, catalog, options, jobs, writer.hashes)
+    if errors:
+        return 1
+
+    if not args.dry_run:
+        print("All room pages generated successfully!")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
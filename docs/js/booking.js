@@ -10,173 +10,148 @@ const BookingState = {
     checkOutDate: null,
     guests: 1,
     totalPrice: 0,
+    // Lowest and highest nightly rate of the stay, and its nights that are booked out
+    rateRange: null,
+    unavailableDates: [],
     isProcessing: false
 };
 
-// Room data with pricing and availability
-const RoomData = {
-    'room-1': {
-        id: 'room-1',
-        name: 'Executive Suite',
-        price: 79,
-        maxGuests: 2,
-        amenities: ['King Bed', 'City View', 'Work Desk', 'Mini Bar', 'Free WiFi', 'Room Service']
-    },
-    'room-2': {
-        id: 'room-2',
-        name: 'Deluxe Ocean View',
-        price: 39,
-        maxGuests: 3,
-        amenities: ['Queen Bed', 'Ocean View', 'Balcony', 'Mini Bar', 'Free WiFi', 'Spa Access']
-    },
-    'room-3': {
-        id: 'room-3',
-        name: 'Presidential Suite',
-        price: 49,
-        maxGuests: 4,
-        amenities: ['King Bed', 'Living Room', 'Kitchen', 'Balcony', 'Butler Service', 'Premium WiFi']
-    },
-    'room-4': {
-        id: 'room-4',
-        name: 'Garden Villa',
-        price: 60,
-        maxGuests: 4,
-        amenities: ['King Bed', 'Garden View', 'Private Patio', 'Kitchenette', 'Free WiFi', 'Pool Access']
-    },
-    'room-5': {
-        id: 'room-5',
-        name: 'Penthouse Suite',
-        price: 39,
-        maxGuests: 6,
-        amenities: ['Master Bedroom', 'Panoramic View', 'Full Kitchen', 'Terrace', 'Concierge Service', 'Premium Amenities']
-    },
-    'room-6': {
-        id: 'room-6',
-        name: 'Classic Double',
-        price: 55,
-        maxGuests: 2,
-        amenities: ['Double Bed', 'City View', 'Work Area', 'Free WiFi', 'Daily Housekeeping']
-    },
-    'room-7': {
-        id: 'room-7',
-        name: 'Superior Twin',
-        price: 45,
-        maxGuests: 2,
-        amenities: ['Twin Beds', 'Garden View', 'Seating Area', 'Mini Fridge', 'Free WiFi']
-    },
-    'room-8': {
-        id: 'room-8',
-        name: 'Junior Suite',
-        price: 48,
-        maxGuests: 3,
-        amenities: ['Queen Bed', 'Separate Lounge', 'Work Desk', 'Mini Bar', 'Free WiFi', 'Express Check-in']
-    },
-    'room-9': {
-        id: 'room-9',
-        name: 'Family Room',
-        price: 60,
-        maxGuests: 5,
-        amenities: ['King + Sofa Bed', 'Family Amenities', 'Kitchenette', 'Game Area', 'Free WiFi', 'Kids Welcome']
-    },
-    'room-10': {
-        id: 'room-10',
-        name: 'Luxury Studio',
-        price: 35,
-        maxGuests: 2,
-        amenities: ['Queen Bed', 'Studio Layout', 'Kitchenette', 'Work Space', 'Free WiFi', 'Modern Design']
-    },
-    'room-11': {
-        id: 'room-11',
-        name: 'Romantic Suite',
-        price: 60,
-        maxGuests: 2,
-        amenities: ['King Bed', 'Romantic Decor', 'Jacuzzi', 'Champagne Service', 'Free WiFi', 'Late Checkout']
-    },
-    'room-12': {
-        id: 'room-12',
-        name: 'Business Suite',
-        price: 45,
-        maxGuests: 2,
-        amenities: ['King Bed', 'Office Space', 'Meeting Area', 'Business Center Access', 'Premium WiFi', 'Express Services']
-    },
-    'room-13': {
-        id: 'room-13',
-        name: 'Spa Retreat',
-        price: 75,
-        maxGuests: 2,
-        amenities: ['King Bed', 'Spa Access', 'Wellness Amenities', 'Meditation Space', 'Free WiFi', 'Healthy Minibar']
-    },
-    'room-14': {
-        id: 'room-14',
-        name: 'Artist Loft',
-        price: 64,
-        maxGuests: 3,
-        amenities: ['Queen Bed', 'Creative Space', 'Art Supplies', 'Natural Light', 'Free WiFi', 'Inspiring Views']
-    },
-    'room-15': {
-        id: 'room-15',
-        name: 'Royal Villa',
-        price: 58,
-        maxGuests: 8,
-        amenities: ['Multiple Bedrooms', 'Private Pool', 'Full Kitchen', 'Butler Service', 'Premium WiFi', 'Exclusive Access']
+// Room data with pricing and availability, filled lazily from the catalog
+// files that generate_rooms.py emits into data/
+const RoomData = {};
+
+// Resolve data/ relative to this script so it works from / and /rooms/
+const ROOM_DATA_URL = new URL('../data/', document.currentScript ? document.currentScript.src : window.location.href);
+const roomDataRequests = {};
+
+/**
+ * Load catalog data: a single room when roomId is given, otherwise every room
+ */
+function loadRoomData(roomId) {
+    const key = roomId || '*';
+    if (!roomDataRequests[key]) {
+        const url = new URL(roomId ? `rooms/${roomId}.json` : 'rooms.json', ROOM_DATA_URL);
+        roomDataRequests[key] = fetch(url)
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Failed to load room data (${response.status})`);
+                }
+                return response.json();
+            })
+            .then(data => {
+                [].concat(data).forEach(room => {
+                    RoomData[room.id] = room;
+                });
+                return RoomData;
+            })
+            .catch(error => {
+                delete roomDataRequests[key];
+                throw error;
+            });
     }
-};
+    return roomDataRequests[key];
+}
 
-document.addEventListener('DOMContentLoaded', function() {
-    initializeBookingSystem();
-    generateRoomCards();
-});
+// Availability and nightly rates, one shard per room and month, also emitted
+// by generate_rooms.py (see build_calendar.py for the format)
+const CALENDAR_URL = new URL('calendar/', ROOM_DATA_URL);
+const calendarRequests = {};
 
 /**
- * Initialize the booking system
+ * Fetch a calendar file once; month shards carry a version so they stay cached until they change
  */
-function initializeBookingSystem() {
-    initializeDatePickers();
-    initializeBookingForms();
-    initializeGuestSelectors();
-    initializeRoomSelection();
-    updateBookingSummary();
+function loadCalendarFile(path) {
+    if (!calendarRequests[path]) {
+        calendarRequests[path] = fetch(new URL(path, CALENDAR_URL))
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Failed to load availability (${response.status})`);
+                }
+                return response.json();
+            })
+            .catch(error => {
+                delete calendarRequests[path];
+                throw error;
+            });
+    }
+    return calendarRequests[path];
 }
 
 /**
- * Generate room cards for the homepage
+ * Load one month ('YYYY-MM') of a room's calendar.
+ * Resolves to { available: bitmap, prices: [rate of each day] }, or null when
+ * the export has no rows for that month and every night is open at the catalog price.
  */
-function generateRoomCards() {
-    const roomsContainer = document.querySelector('.grid.grid-cols-1.md\\:grid-cols-2.lg\\:grid-cols-3.gap-8');
-    
-    if (roomsContainer) {
-        roomsContainer.innerHTML = '';
-        
-        Object.values(RoomData).forEach(room => {
-            const roomCard = createRoomCard(room);
-            roomsContainer.appendChild(roomCard);
+function loadCalendarMonth(roomId, month) {
+    return loadCalendarFile(`${roomId}/index.json`).then(index => {
+        const version = index.months[month];
+        if (!version) {
+            return null;
+        }
+        return loadCalendarFile(`${roomId}/${month}.json?v=${version}`).then(shard => {
+            // Prices are delta-encoded: the first night in full, then changes
+            const prices = [];
+            shard.p.reduce((price, delta) => {
+                prices.push(price + delta);
+                return price + delta;
+            }, 0);
+            return { available: shard.a, prices };
         });
+    });
+}
+
+/**
+ * Every night of a stay as 'YYYY-MM-DD', check-out excluded
+ */
+function stayNights(checkIn, checkOut) {
+    const nights = [];
+    const end = new Date(`${checkOut}T00:00:00Z`);
+    for (let night = new Date(`${checkIn}T00:00:00Z`); night < end; night.setUTCDate(night.getUTCDate() + 1)) {
+        nights.push(night.toISOString().split('T')[0]);
     }
+    return nights;
 }
 
 /**
- * Create a room card element
+ * Price a stay from the calendar, fetching only the months it spans.
+ * Resolves to { nights, total, rateRange: [min, max], unavailable: [dates] }.
  */
-function createRoomCard(room) {
-    const card = document.createElement('div');
-    card.className = 'room-card bg-white rounded-lg shadow-lg overflow-hidden hover:shadow-xl transition-shadow duration-300';
-    
-    card.innerHTML = `
-        <div class="room-card-body p-6">
-            <h3 class="room-title text-xl font-semibold text-gray-900 mb-2">${room.name}</h3>
-            <p class="room-description text-gray-600 mb-4">Experience luxury and comfort in our beautifully appointed ${room.name.toLowerCase()}.</p>
-            <div class="room-price text-2xl font-bold text-blue-600 mb-4">$${room.price}<span class="text-sm font-normal text-gray-500">/night</span></div>
-            <ul class="room-features mb-6">
-                ${room.amenities.slice(0, 4).map(amenity => `<li class="text-gray-600 text-sm mb-1">✓ ${amenity}</li>`).join('')}
-            </ul>
-            <div class="flex flex-col sm:flex-row gap-2">
-                <a href="rooms/${room.id}.html" class="btn btn-primary flex-1 text-center">View Details</a>
-                <button onclick="quickBook('${room.id}')" class="btn btn-outline-primary flex-1">Quick Book</button>
-            </div>
-        </div>
-    `;
-    
-    return card;
+function quoteStay(roomId, checkIn, checkOut) {
+    const room = RoomData[roomId];
+    const nights = stayNights(checkIn, checkOut);
+    const months = [...new Set(nights.map(night => night.slice(0, 7)))];
+
+    return Promise.all(months.map(month => loadCalendarMonth(roomId, month))).then(shards => {
+        const quote = { nights: nights.length, total: 0, rateRange: null, unavailable: [] };
+        nights.forEach(night => {
+            const shard = shards[months.indexOf(night.slice(0, 7))];
+            const day = Number(night.slice(8));
+            const price = shard ? shard.prices[day - 1] : room.price;
+            if (shard && !((shard.available >>> (day - 1)) & 1)) {
+                quote.unavailable.push(night);
+            }
+            quote.total += price;
+            quote.rateRange = quote.rateRange
+                ? [Math.min(quote.rateRange[0], price), Math.max(quote.rateRange[1], price)]
+                : [price, price];
+        });
+        return quote;
+    });
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    initializeBookingSystem();
+});
+
+/**
+ * Initialize the booking system
+ */
+function initializeBookingSystem() {
+    initializeDatePickers();
+    initializeBookingForms();
+    initializeGuestSelectors();
+    initializeRoomSelection();
+    updateBookingSummary();
 }
 
 /**
@@ -194,8 +169,7 @@ function initializeDatePickers() {
         input.addEventListener('change', function() {
             BookingState.checkInDate = this.value;
             updateCheckOutMinDate();
-            calculateTotalPrice();
-            updateBookingSummary();
+            calculateTotalPrice().then(updateBookingSummary);
         });
     });
     
@@ -203,8 +177,7 @@ function initializeDatePickers() {
         input.min = tomorrow;
         input.addEventListener('change', function() {
             BookingState.checkOutDate = this.value;
-            calculateTotalPrice();
-            updateBookingSummary();
+            calculateTotalPrice().then(updateBookingSummary);
         });
     });
 }
@@ -271,10 +244,17 @@ function initializeRoomSelection() {
     const roomFileName = pathParts[pathParts.length - 1];
     const roomId = roomFileName.replace('.html', '');
     
-    if (RoomData[roomId]) {
-        BookingState.selectedRoom = roomId;
-        populateRoomDetails(roomId);
+    if (!/^room-\d+$/.test(roomId)) {
+        return;
     }
+    
+    loadRoomData(roomId)
+        .then(() => {
+            BookingState.selectedRoom = roomId;
+            populateRoomDetails(roomId);
+            calculateTotalPrice().then(updateBookingSummary);
+        })
+        .catch(error => console.warn(error.message));
 }
 
 /**
@@ -488,6 +468,9 @@ function validateBookingForm(form) {
         if (new Date(BookingState.checkInDate) >= new Date(BookingState.checkOutDate)) {
             showFieldError(form.querySelector('[name="checkout"], [name="check-out"]'), 'Check-out date must be after check-in date');
             isValid = false;
+        } else if (BookingState.unavailableDates.length) {
+            showFieldError(form.querySelector('[name="checkin"], [name="check-in"]'), 'The room is booked out on some of these nights');
+            isValid = false;
         }
     }
     
@@ -596,7 +579,9 @@ function validateGuestCount() {
 }
 
 /**
- * Calculate total price
+ * Calculate total price.
+ * Starts from the catalog rate, then resolves once the seasonal rates and
+ * blocked nights of the stay are known; without a calendar the catalog rate stands.
  */
 function calculateTotalPrice() {
     if (BookingState.selectedRoom && BookingState.checkInDate && BookingState.checkOutDate) {
@@ -607,8 +592,31 @@ function calculateTotalPrice() {
         
         if (nights > 0) {
             BookingState.totalPrice = room.price * nights;
+            BookingState.rateRange = null;
+            BookingState.unavailableDates = [];
+
+            const stay = [BookingState.selectedRoom, BookingState.checkInDate, BookingState.checkOutDate];
+            return quoteStay(...stay)
+                .then(quote => {
+                    // Ignore quotes for dates that were changed in the meantime
+                    if (stay.join() !== [BookingState.selectedRoom, BookingState.checkInDate, BookingState.checkOutDate].join()) {
+                        return;
+                    }
+                    BookingState.totalPrice = quote.total;
+                    BookingState.rateRange = quote.rateRange;
+                    BookingState.unavailableDates = quote.unavailable;
+                })
+                .catch(error => console.warn(error.message));
         }
     }
+    return Promise.resolve();
+}
+
+/**
+ * Format a [min, max] nightly rate as '$399' or '$399–$549'
+ */
+function formatRateRange(range) {
+    return range[0] === range[1] ? `$${range[0]}` : `$${range[0]}–$${range[1]}`;
 }
 
 /**
@@ -637,8 +645,11 @@ function updateBookingSummary() {
                         </div>
                         <div class="flex justify-between mb-2">
                             <span>Rate:</span>
-                            <span>$${room.price}/night</span>
-                        </div>
+                            <span>${formatRateRange(BookingState.rateRange || [room.price, room.price])}/night</span>
+                        </div>${BookingState.unavailableDates.length ? `
+                        <div class="mb-2 text-sm text-red-600">
+                            Booked out on ${BookingState.unavailableDates.join(', ')}
+                        </div>` : ''}
                         <div class="flex justify-between font-bold text-lg border-t pt-2">
                             <span>Total:</span>
                             <span>$${BookingState.totalPrice}</span>
@@ -754,6 +765,9 @@ function showNotification(message, type) {
 window.BookingUtils = {
     BookingState,
     RoomData,
+    loadRoomData,
+    loadCalendarMonth,
+    quoteStay,
     quickBook,
     closeBookingModal,
     calculateTotalPrice,
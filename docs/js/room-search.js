@@ -0,0 +1,178 @@
+/**
+ * Room search for Luxury Villa Retreat
+ * Answers price / capacity / amenity filters from the precomputed index that
+ * generate_rooms.py writes to data/search/, without scanning RoomData
+ */
+
+// Resolve data/ relative to this script so it works from / and /rooms/
+const SEARCH_INDEX_URL = new URL('../data/search/', document.currentScript ? document.currentScript.src : window.location.href);
+const searchShardRequests = {};
+
+/**
+ * Fetch a shard of the index once; the header's build hash busts stale copies
+ */
+function loadSearchShard(name, build) {
+    const key = build ? `${name}?v=${build}` : name;
+    if (!searchShardRequests[key]) {
+        searchShardRequests[key] = fetch(new URL(key, SEARCH_INDEX_URL))
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(`Failed to load search index (${response.status})`);
+                }
+                return response.json();
+            })
+            .catch(error => {
+                delete searchShardRequests[key];
+                throw error;
+            });
+    }
+    return searchShardRequests[key];
+}
+
+/**
+ * Load the header shard: room count, price range, capacities and amenity names.
+ * This is all the filter controls need to render.
+ */
+function loadSearchHeader() {
+    return loadSearchShard('index.json');
+}
+
+/**
+ * Decode a base64 bitset into a Uint8Array
+ */
+function decodeBitset(encoded) {
+    const binary = atob(encoded);
+    const bits = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bits[i] = binary.charCodeAt(i);
+    }
+    return bits;
+}
+
+const decodedBitsets = new Map();
+
+function getBitset(encoded) {
+    let bits = decodedBitsets.get(encoded);
+    if (!bits) {
+        bits = decodeBitset(encoded);
+        decodedBitsets.set(encoded, bits);
+    }
+    return bits;
+}
+
+/**
+ * Index of the first element of a sorted array that is >= value (or > value when upper is set)
+ */
+function bisect(sorted, value, upper) {
+    let lo = 0;
+    let hi = sorted.length;
+    while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (sorted[mid] < value || (upper && sorted[mid] === value)) {
+            lo = mid + 1;
+        } else {
+            hi = mid;
+        }
+    }
+    return lo;
+}
+
+function intersect(result, bits) {
+    for (let i = 0; i < result.length; i++) {
+        result[i] &= bits[i];
+    }
+}
+
+/**
+ * Find the rooms matching a filter.
+ *
+ * filters: { minPrice, maxPrice, guests, amenities: [names] }; every field is
+ * optional. Resolves to the matching room positions in catalog order, which
+ * is also the order of the rooms/index.html cards.
+ */
+function searchRoomPositions(filters) {
+    filters = filters || {};
+    return loadSearchHeader().then(header => {
+        const build = header.build;
+        const amenities = filters.amenities || [];
+        const wantsPrice = filters.minPrice != null || filters.maxPrice != null;
+        const wantsGuests = filters.guests != null;
+
+        if (amenities.some(name => !header.amenities.includes(name))) {
+            return [];
+        }
+        const amenityShards = [...new Set(amenities.map(name =>
+            `amenities-${Math.floor(header.amenities.indexOf(name) / header.amenityShardSize)}.json`))];
+
+        return Promise.all([
+            wantsPrice ? loadSearchShard('price.json', build) : null,
+            wantsGuests ? loadSearchShard('capacity.json', build) : null,
+            Promise.all(amenityShards.map(name => loadSearchShard(name, build)))
+        ]).then(([price, capacity, shards]) => {
+            const result = new Uint8Array((header.count + 7) >> 3).fill(0xff);
+
+            if (price) {
+                const lo = filters.minPrice != null ? bisect(price.prices, filters.minPrice, false) : 0;
+                const hi = filters.maxPrice != null ? bisect(price.prices, filters.maxPrice, true) : price.prices.length;
+                const inRange = new Uint8Array(result.length);
+                for (let i = lo; i < hi; i++) {
+                    const position = price.order[i];
+                    inRange[position >> 3] |= 1 << (position & 7);
+                }
+                intersect(result, inRange);
+            }
+
+            if (capacity) {
+                const bucket = bisect(capacity.capacities, filters.guests, false);
+                if (bucket === capacity.capacities.length) {
+                    return [];
+                }
+                intersect(result, getBitset(capacity.atLeast[bucket]));
+            }
+
+            const merged = Object.assign({}, ...shards);
+            amenities.forEach(name => intersect(result, getBitset(merged[name])));
+
+            const positions = [];
+            for (let i = 0; i < header.count; i++) {
+                if (result[i >> 3] & (1 << (i & 7))) {
+                    positions.push(i);
+                }
+            }
+            return positions;
+        });
+    });
+}
+
+/**
+ * Find the rooms matching a filter; resolves to their ids in catalog order
+ */
+function searchRooms(filters) {
+    return loadSearchHeader()
+        .then(header => Promise.all([
+            searchRoomPositions(filters),
+            loadSearchShard('ids.json', header.build)
+        ]))
+        .then(([positions, ids]) => positions.map(i => ids[i]));
+}
+
+/**
+ * Show only the rooms/index.html cards at the given positions
+ */
+function showRoomCards(positions) {
+    const container = document.getElementById('rooms-grid');
+    if (!container) return;
+
+    const visible = new Set(positions);
+    container.querySelectorAll('[data-room-id]').forEach((card, i) => {
+        card.classList.toggle('hidden', !visible.has(i));
+    });
+}
+
+// Export search utilities
+window.RoomSearch = {
+    loadSearchHeader,
+    searchRoomPositions,
+    searchRooms,
+    showRoomCards
+};
@@ -0,0 +1,187 @@
+"""Small precompiled template engine for the site generator.
+
+Syntax:
+    {{ name }}               context value, HTML-escaped
+    {{ name|safe }}          context value inserted verbatim (pre-rendered markup)
+    {% include "path" %}     another template, inlined when compiling
+
+Includes are resolved at compile time, so shared fragments (navigation,
+footer, policies) become part of the literal chunks and are laid out once
+per process rather than once per page. Rendering a compiled template is a
+single join over those chunks with the slot values dropped in; render_chunks
+returns the pieces unjoined so large pages can be streamed to disk.
+
+A loader can also run every literal chunk through a filter at compile time
+(the generator uses this to minify page markup once per template instead
+of once per page).
+
+Compiled templates are also cached on disk, keyed by a hash of their source,
+so later builds skip parsing altogether.
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+
+ENGINE_VERSION = 1
+
+_TOKEN_RE = re.compile(
+    r'\{\{\s*(?P<name>\w+)(?P<safe>\|safe)?\s*\}\}'
+    r'|\{%\s*include\s+"(?P<include>[^"]+)"\s*%\}'
+)
+
+
+_NEEDS_ESCAPE_RE = re.compile(r'[&<>"\']')
+
+
+def escape(value):
+    # Most slot values are plain text; skip html.escape's five replaces for them
+    return html.escape(value) if _NEEDS_ESCAPE_RE.search(value) else value
+
+
+def _sha256(data):
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class Template:
+    """A compiled template: literal chunks interleaved with named slots."""
+
+    def __init__(self, chunks, digest):
+        # chunks: list of str (literal) or [name, safe] (slot)
+        self.chunks = chunks
+        self.digest = digest
+        self.render, self.render_chunks = self._build_renderers(chunks)
+
+    @staticmethod
+    def _build_renderers(chunks):
+        # Turn the chunk list into two Python functions: render returns a
+        # single f-string expression, which CPython assembles in one
+        # BUILD_STRING; render_chunks returns the same pieces as a tuple
+        joined = []
+        split = []
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                joined.append(repr(chunk))
+                split.append(repr(chunk))
+            else:
+                name, safe = chunk
+                # Slot names are \w+, so they can sit in double quotes inside the f-string
+                value = f'context["{name}"]' if safe else f'_escape(_str(context["{name}"]))'
+                joined.append(f"f'{{{value}}}'")
+                split.append(f'_str({value})' if safe else value)
+        body = '\n        '.join(joined) or "''"
+        items = ''.join(f'{piece},\n        ' for piece in split)
+        code = (f'def render(context, _str=str, _escape=_escape):\n'
+                f'    return (\n        {body}\n    )\n'
+                f'def render_chunks(context, _str=str, _escape=_escape):\n'
+                f'    return (\n        {items}\n    )\n')
+        namespace = {'_escape': escape}
+        exec(code, namespace)
+        return namespace['render'], namespace['render_chunks']
+
+
+class TemplateLoader:
+    """Loads templates from a directory, compiling each at most once per process.
+
+    literal_filter, if given, rewrites every literal chunk after includes are
+    inlined; filter_key must change whenever the filter's output would, as
+    it is part of the disk cache key.
+    """
+
+    def __init__(self, root, cache_dir=None, literal_filter=None, filter_key=''):
+        self.root = root
+        self.cache_dir = cache_dir
+        self.literal_filter = literal_filter
+        self.filter_key = filter_key
+        self._templates = {}
+
+    def get(self, name):
+        template = self._templates.get(name)
+        if template is None:
+            template = self._templates[name] = self._load(name)
+        return template
+
+    def clear(self):
+        """Forget the compiled templates, so the next get() re-reads the sources."""
+        self._templates.clear()
+
+    def _read(self, name):
+        path = os.path.join(self.root, name)
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        # Like Jinja, drop the file's final newline so includes sit inline
+        return source[:-1] if source.endswith('\n') else source
+
+    def _load(self, name):
+        source = self._read(name)
+        cache_path = None
+        if self.cache_dir:
+            key = _sha256(f'{ENGINE_VERSION}\0{self.filter_key}\0{name}\0{source}')
+            cache_path = os.path.join(self.cache_dir, f'{key}.json')
+            cached = self._load_cached(cache_path)
+            if cached is not None:
+                return cached
+
+        deps = {}
+        chunks = self._compile(name, source, deps, ())
+        if self.literal_filter:
+            chunks = [self.literal_filter(c) if isinstance(c, str) else c for c in chunks]
+        digest = _sha256(json.dumps([ENGINE_VERSION, chunks], sort_keys=True))
+        template = Template(chunks, digest)
+
+        if cache_path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'deps': deps, 'digest': digest, 'chunks': chunks}, f)
+            os.replace(tmp_path, cache_path)
+        return template
+
+    def _load_cached(self, cache_path):
+        try:
+            with open(cache_path, encoding='utf-8') as f:
+                cached = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        # The key only covers the top-level source; check every include too
+        for dep, dep_hash in cached['deps'].items():
+            try:
+                if _sha256(self._read(dep)) != dep_hash:
+                    return None
+            except FileNotFoundError:
+                return None
+        return Template(cached['chunks'], cached['digest'])
+
+    def _compile(self, name, source, deps, stack):
+        if name in stack:
+            raise ValueError(f"template include cycle: {' -> '.join(stack + (name,))}")
+        stack = stack + (name,)
+        deps[name] = _sha256(source)
+
+        chunks = []
+
+        def add_text(text):
+            if not text:
+                return
+            if chunks and isinstance(chunks[-1], str):
+                chunks[-1] += text
+            else:
+                chunks.append(text)
+
+        pos = 0
+        for match in _TOKEN_RE.finditer(source):
+            add_text(source[pos:match.start()])
+            pos = match.end()
+            include = match.group('include')
+            if include:
+                for chunk in self._compile(include, self._read(include), deps, stack):
+                    if isinstance(chunk, str):
+                        add_text(chunk)
+                    else:
+                        chunks.append(chunk)
+            else:
+                chunks.append([match.group('name'), bool(match.group('safe'))])
+        add_text(source[pos:])
+        return chunks
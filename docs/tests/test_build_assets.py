@@ -0,0 +1,40 @@
+import shutil
+import subprocess
+
+import pytest
+
+from build_assets import minify_js
+
+
+@pytest.mark.parametrize('source, expected', [
+    ('var a = domain / 2;\nvar s = "a/b"; var t = "//"; console.log(a, s, t);',
+     'var a = domain / 2;\nvar s = "a/b"; var t = "//"; console.log(a, s, t);'),
+    ('var x = main / origin / 2; var y = "//";', 'var x = main / origin / 2; var y = "//";'),
+    ('var z = login/2, w = undo/ 4; // comment', 'var z = login/2, w = undo/ 4;'),
+    ('var q = a$return / 2; var r = x_in / 3;', 'var q = a$return / 2; var r = x_in / 3;'),
+])
+def test_division_after_identifier_ending_in_keyword(source, expected):
+    assert minify_js(source) == expected
+
+
+@pytest.mark.parametrize('source', [
+    'function f(s) {\n    return /a\\/b/g.test(s);\n}',
+    'if (typeof /x/ === "object") {}',
+    'var r = x.split(/,\\s*/);',
+    'var t = a ? /"/ : /\'/;',
+])
+def test_regex_literals_are_copied(source):
+    assert minify_js(source) == '\n'.join(line.strip() for line in source.splitlines())
+
+
+def test_comments_are_removed():
+    source = 'var a = 4 / 2; // half\n/* block */var b = a / 2;'
+    assert minify_js(source) == 'var a = 4 / 2;\nvar b = a / 2;'
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='needs node')
+def test_minified_division_runs_in_node():
+    source = 'var domain = 8; var a = domain / 2;\nvar s = "a/b"; var t = "//"; console.log(a, s, t);'
+    result = subprocess.run(['node', '-e', minify_js(source)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == '4 a/b //'
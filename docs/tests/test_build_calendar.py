@@ -0,0 +1,83 @@
+import json
+import os
+
+import pytest
+
+from build_calendar import INDEX_FILE, encode_month, load_availability, write_calendar
+
+
+def decode_month(data):
+    # The inverse of encode_month, as js/booking.js reads a shard
+    shard = json.loads(data)
+    prices = []
+    for delta in shard['p']:
+        prices.append(delta + (prices[-1] if prices else 0))
+    return [(bool(shard['a'] >> day & 1), price) for day, price in enumerate(prices)]
+
+
+@pytest.mark.parametrize('month, days', [('2026-02', 28), ('2028-02', 29), ('2026-12', 31)])
+def test_encode_month_round_trip(month, days):
+    nights = {1: (False, None), 2: (True, 549), 3: (True, 549), 15: (False, 120), days: (True, 0)}
+    decoded = decode_month(encode_month(month, nights, 399))
+    assert len(decoded) == days
+    for day, (available, price) in enumerate(decoded, start=1):
+        expected_available, expected_price = nights.get(day, (True, None))
+        assert available == expected_available
+        assert price == (399 if expected_price is None else expected_price)
+
+
+def test_encode_month_runs_of_equal_rates_are_zeros():
+    shard = json.loads(encode_month('2026-04', {}, 250))
+    assert shard == {'a': (1 << 30) - 1, 'p': [250] + [0] * 29}
+
+
+def test_load_availability_blank_fields_and_errors(tmp_path):
+    path = tmp_path / 'availability.csv'
+    path.write_text('room_id,date,available,price\n'
+                    'room-2,2026-12-24,,\n'
+                    'room-2,2026-12-25,0,549\n')
+    assert load_availability(str(path)) == {
+        ('room-2', '2026-12'): {24: (True, None), 25: (False, 549)},
+    }
+    path.write_text('room_id,date,available,price\nroom-2\n')
+    with pytest.raises(ValueError, match='bad date'):
+        load_availability(str(path))
+
+
+def test_write_calendar_skips_unchanged_shards(tmp_path):
+    out_dir = str(tmp_path / 'calendar')
+    rooms = [{'id': 'room-2', 'price': 399}, {'id': 'room-3', 'price': 199}]
+    months = {
+        ('room-2', '2026-12'): {24: (True, 549), 25: (False, None)},
+        ('room-2', '2027-01'): {1: (False, None)},
+        ('room-3', '2026-12'): {31: (True, 250)},
+        ('room-9', '2026-12'): {1: (True, 100), 2: (True, 100)},
+    }
+    files = {}
+
+    def write(path, data):
+        files[os.path.relpath(path, out_dir)] = data
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    state = {}
+    assert write_calendar(rooms, months, out_dir, write, state) == (3, 2)
+    index = json.loads(files[os.path.join('room-2', INDEX_FILE)])
+    assert sorted(index['months']) == ['2026-12', '2027-01']
+    assert index['months']['2026-12'] == state['room-2/2026-12'][1]
+
+    files.clear()
+    assert write_calendar(rooms, months, out_dir, write, state) == (0, 2)
+    assert all(name.endswith(INDEX_FILE) for name in files)
+
+    # A new catalog price re-encodes that room's shards only
+    rooms[1]['price'] = 209
+    assert write_calendar(rooms, months, out_dir, write, state) == (1, 2)
+    assert write_calendar(rooms, months, out_dir, write, state, force=True) == (3, 2)
+
+    # Months that fall out of the export are pruned
+    del months[('room-2', '2027-01')]
+    assert write_calendar(rooms, months, out_dir, write, state) == (0, 2)
+    assert sorted(os.listdir(os.path.join(out_dir, 'room-2'))) == ['2026-12.json', INDEX_FILE]
+    assert 'room-2/2027-01' not in state
@@ -0,0 +1,94 @@
+import base64
+import bisect
+import json
+import random
+
+import pytest
+
+from build_search import AMENITIES_PER_SHARD, HEADER_FILE, build_search_index
+
+AMENITIES = [f'Amenity {i:02d}' for i in range(AMENITIES_PER_SHARD + 5)]
+
+
+def synthetic_rooms(count, seed=1):
+    rng = random.Random(seed)
+    return [{
+        'id': f'room-{i}',
+        'price': rng.choice([99, 150, 150, 199, 250, 399, 549]),
+        'maxGuests': rng.randint(1, 6),
+        'amenities': rng.sample(AMENITIES, rng.randint(0, 6)),
+    } for i in range(count)]
+
+
+def positions(encoded, count):
+    bits = base64.b64decode(encoded)
+    return {i for i in range(count) if bits[i >> 3] >> (i & 7) & 1}
+
+
+def search(files, min_price=None, max_price=None, guests=None, amenities=()):
+    # The same steps as searchRoomPositions in js/room-search.js
+    header = json.loads(files[HEADER_FILE])
+    count = header['count']
+    result = set(range(count))
+    if min_price is not None or max_price is not None:
+        price = json.loads(files['price.json'])
+        lo = bisect.bisect_left(price['prices'], min_price) if min_price is not None else 0
+        hi = (bisect.bisect_right(price['prices'], max_price) if max_price is not None
+              else len(price['prices']))
+        result &= set(price['order'][lo:hi])
+    if guests is not None:
+        capacity = json.loads(files['capacity.json'])
+        bucket = bisect.bisect_left(capacity['capacities'], guests)
+        if bucket == len(capacity['capacities']):
+            return set()
+        result &= positions(capacity['atLeast'][bucket], count)
+    for name in amenities:
+        if name not in header['amenities']:
+            return set()
+        shard = header['amenities'].index(name) // header['amenityShardSize']
+        result &= positions(json.loads(files[f'amenities-{shard}.json'])[name], count)
+    return result
+
+
+def brute_force(rooms, min_price=None, max_price=None, guests=None, amenities=()):
+    return {i for i, room in enumerate(rooms)
+            if (min_price is None or room['price'] >= min_price)
+            and (max_price is None or room['price'] <= max_price)
+            and (guests is None or room['maxGuests'] >= guests)
+            and all(name in room['amenities'] for name in amenities)}
+
+
+@pytest.mark.parametrize('count', [1, 8, 9, 200])
+def test_index_matches_brute_force(count):
+    rooms = synthetic_rooms(count)
+    files = build_search_index(rooms)
+    rng = random.Random(count)
+    for _ in range(300):
+        filters = {
+            'min_price': rng.choice([None, 0, 99, 150, 151, 400]),
+            'max_price': rng.choice([None, 98, 150, 250, 1000]),
+            'guests': rng.choice([None, 1, 3, 6, 7]),
+            'amenities': rng.sample(AMENITIES + ['Unknown'], rng.randint(0, 2)),
+        }
+        assert search(files, **filters) == brute_force(rooms, **filters), filters
+
+
+def test_header_and_shards():
+    rooms = synthetic_rooms(50)
+    files = build_search_index(rooms)
+    header = json.loads(files[HEADER_FILE])
+    assert json.loads(files['ids.json']) == [room['id'] for room in rooms]
+    assert header['priceRange'] == [min(r['price'] for r in rooms), max(r['price'] for r in rooms)]
+    used = sorted({name for room in rooms for name in room['amenities']})
+    assert header['amenities'] == used
+    shards = [name for name in files if name.startswith('amenities-')]
+    assert len(shards) == -(-len(used) // AMENITIES_PER_SHARD)
+
+    # The build hash changes with any shard, so clients refetch
+    rooms[0]['price'] += 1
+    assert json.loads(build_search_index(rooms)[HEADER_FILE])['build'] != header['build']
+
+
+def test_empty_catalog():
+    header = json.loads(build_search_index([])[HEADER_FILE])
+    assert header['count'] == 0 and header['priceRange'] == [0, 0]
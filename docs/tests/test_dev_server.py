@@ -0,0 +1,50 @@
+import socket
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+import dev_server
+
+
+@pytest.fixture
+def site(tmp_path):
+    root = tmp_path / 'site'
+    (root / 'rooms').mkdir(parents=True)
+    (root / 'index.html').write_text('<html><body>home</body></html>')
+    (root / 'rooms' / 'index.html').write_text('<html><body>rooms</body></html>')
+    (tmp_path / 'secret.html').write_text('secret')
+    handler = partial(dev_server.DevRequestHandler, directory=str(root))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server.server_address
+    server.shutdown()
+    server.server_close()
+
+
+def raw_get(address, path):
+    # Sent by hand, as an HTTP client would normalise the '..' away
+    with socket.create_connection(address) as s:
+        s.sendall(f'GET {path} HTTP/1.0\r\n\r\n'.encode())
+        response = b''
+        while chunk := s.recv(65536):
+            response += chunk
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), body
+
+
+@pytest.mark.parametrize('path', ['/../secret.html', '/rooms/../../secret.html',
+                                  '/%2e%2e/secret.html'])
+def test_pages_outside_the_site_are_not_served(site, path):
+    status, body = raw_get(site, path)
+    assert b'secret' not in body
+    assert status == 404
+
+
+@pytest.mark.parametrize('path, text', [('/', b'home'), ('/rooms/', b'rooms'),
+                                        ('/rooms/index.html?x=1', b'rooms')])
+def test_pages_get_the_reload_snippet(site, path, text):
+    status, body = raw_get(site, path)
+    assert status == 200
+    assert text in body and dev_server.RELOAD_PATH.encode() in body
@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+import generate_rooms
+from build_output import ENCODINGS, OutputWriter, SIBLING_SUFFIXES
+
+
+@pytest.fixture(autouse=True)
+def no_template_cache(monkeypatch):
+    monkeypatch.setattr(generate_rooms.templates, 'cache_dir', None)
+    monkeypatch.setattr(generate_rooms.minified_templates, 'cache_dir', None)
+
+
+@pytest.fixture(scope='module')
+def rooms():
+    return generate_rooms.load_catalog()['rooms'][:3]
+
+
+@pytest.fixture(scope='module')
+def optimized():
+    with open(os.devnull, 'w') as devnull:
+        options, _ = generate_rooms.build_asset_options(OutputWriter(dry_run=True), log=devnull)
+    return options
+
+
+def test_build_room_transitions(tmp_path, rooms):
+    room = rooms[0]
+    out_dir = str(tmp_path)
+    path = tmp_path / f"{room['id']}.html"
+
+    status, entry = generate_rooms.build_room(room, None, out_dir=out_dir)
+    assert status == 'written'
+    assert entry['output'] == generate_rooms.file_sha256(str(path))
+    assert generate_rooms.build_room(room, entry, out_dir=out_dir) == ('skipped', entry)
+    assert generate_rooms.build_room(room, entry, out_dir=out_dir, force=True)[0] == 'unchanged'
+
+    # A page edited or deleted by hand is rewritten
+    path.write_text('edited')
+    assert generate_rooms.build_room(room, entry, out_dir=out_dir)[0] == 'written'
+    path.unlink()
+    assert generate_rooms.build_room(room, entry, out_dir=out_dir)[0] == 'written'
+
+    changed = dict(room, price=room['price'] + 1)
+    status, new_entry = generate_rooms.build_room(changed, entry, out_dir=out_dir)
+    assert status == 'written' and new_entry['input'] != entry['input']
+
+
+def test_build_room_dry_run_writes_nothing(tmp_path, rooms):
+    status, entry = generate_rooms.build_room(rooms[0], None, out_dir=str(tmp_path), dry_run=True)
+    assert status == 'written' and entry['output']
+    assert os.listdir(tmp_path) == []
+
+
+def test_build_room_restores_siblings(tmp_path, rooms, optimized):
+    room = rooms[0]
+    out_dir = str(tmp_path)
+    path = str(tmp_path / f"{room['id']}.html")
+
+    status, entry = generate_rooms.build_room(room, None, out_dir=out_dir, options=optimized)
+    assert status == 'written' and 'sizes' not in entry
+    assert all(os.path.exists(path + suffix) for suffix in ENCODINGS)
+    assert generate_rooms.build_room(room, entry, out_dir=out_dir, options=optimized)[0] == 'skipped'
+
+    os.remove(path + '.gz')
+    assert generate_rooms.build_room(room, entry, out_dir=out_dir, options=optimized)[0] == 'written'
+    assert os.path.exists(path + '.gz')
+
+    stale = [suffix for suffix in SIBLING_SUFFIXES if suffix not in ENCODINGS]
+    for suffix in stale:
+        with open(path + suffix, 'wb') as f:
+            f.write(b'stale')
+    status, _ = generate_rooms.build_room(room, entry, out_dir=out_dir, options=optimized)
+    assert status == ('written' if stale else 'skipped')
+    assert not any(os.path.exists(path + suffix) for suffix in stale)
+
+    # The transfer report sizes are only measured on request
+    status, measured = generate_rooms.build_room(room, entry, out_dir=out_dir, options=optimized,
+                                                 measure=True)
+    assert status == 'unchanged' and len(measured['sizes']) == 3
+    assert generate_rooms.build_room(room, measured, out_dir=out_dir, options=optimized,
+                                     measure=True)[0] == 'skipped'
+
+    # Plain pages drop the precompressed copies of an optimized build
+    generate_rooms.build_room(room, entry, out_dir=out_dir)
+    assert not any(os.path.exists(path + suffix) for suffix in SIBLING_SUFFIXES)
+
+
+def test_build_all_prunes_removed_rooms(tmp_path, rooms, optimized):
+    out_dir = str(tmp_path / 'rooms')
+    manifest_path = str(tmp_path / 'manifest.json')
+
+    def build(room_list, **kwargs):
+        counts, errors, pages = generate_rooms.build_all(
+            room_list, out_dir=out_dir, manifest_path=manifest_path, options=optimized,
+            verbose=False, **kwargs)
+        assert errors == []
+        with open(manifest_path, encoding='utf-8') as f:
+            assert json.load(f)['pages'] == pages
+        return counts, pages
+
+    counts, pages = build(rooms)
+    assert counts['written'] == 3
+    assert build(rooms)[0]['skipped'] == 3
+
+    # A subset without prune leaves the other rooms alone
+    counts, pages = build(rooms[:1], prune=False)
+    assert counts['skipped'] == 1 and len(pages) == 3
+
+    counts, pages = build(rooms[:1])
+    assert sorted(pages) == [f"rooms/{rooms[0]['id']}.html"]
+    assert sorted(os.listdir(out_dir)) == sorted(
+        f"{rooms[0]['id']}.html{suffix}" for suffix in ('',) + ENCODINGS)
+
+    # A dry run neither writes nor prunes
+    generate_rooms.build_all(rooms, out_dir=out_dir, manifest_path=manifest_path,
+                             options=optimized, verbose=False, dry_run=True)
+    assert len(os.listdir(out_dir)) == 1 + len(ENCODINGS)